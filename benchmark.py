@@ -0,0 +1,150 @@
+import os
+codepath_bsoption = os.path.dirname(os.path.abspath(__file__))
+import sys
+sys.path.append('..')
+
+import datetime
+import json
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from bsoption.bsmodel import BSModel, getBSArray, getIV, getIVArray
+from bsoption.gex import getgex, getnewgex, get0gamma
+from bsoption.optionstrat import Opduo, Opcombo
+
+def makechain(spotprice=20000.0, numstrike=200, strikerange=0.3, tradedate=datetime.date(2024, 1, 2), numday=30,
+              atmiv=20.0, skew=-10.0, smile=60.0, putspread=1.0, oisize=5000, oiwidth=0.1, name='SYN', seed=0):
+    """
+    Deterministic synthetic option chain in the layout of the GEX functions (strike index, `c_`/`p_` columns).
+    IV (in %) is a quadratic smile in log-moneyness, puts `putspread` points above calls; OI is a random
+    size around Gaussian humps above (calls) and below (puts) spot of relative width `oiwidth`.
+    Returns `(dfchain, info)` with `info = (name, tradedate, expiry, spotprice)`.
+    """
+    rng = np.random.default_rng(seed)
+    strikes = np.linspace(spotprice * (1 - strikerange), spotprice * (1 + strikerange), numstrike)
+    logm = np.log(strikes / spotprice)
+    dfchain = pd.DataFrame(index=pd.Index(strikes, name='strike'))
+    dfchain['c_iv'] = atmiv + skew * logm + smile * logm ** 2
+    dfchain['p_iv'] = dfchain['c_iv'] + putspread
+    for side, center in (('c', 1 + oiwidth / 2), ('p', 1 - oiwidth / 2)):
+        hump = np.exp(- ((strikes / spotprice - center) / oiwidth) ** 2)
+        dfchain[f'{side}_oi'] = np.round(rng.integers(0, oisize, numstrike) * hump)
+    expiry = tradedate + datetime.timedelta(days=numday)
+    for side, isCall in (('c', True), ('p', False)):
+        price, delta, _, _, gamma = getBSArray(spotprice, strikes, numday, dfchain[f'{side}_iv'] / 100, 0, isCall)
+        dfchain[f'{side}_close'] = np.round(price, 2)
+        dfchain[f'{side}_delta'] = np.round(delta, 4)
+        dfchain[f'{side}_gamma'] = gamma
+
+    return dfchain, (name, tradedate, expiry, spotprice)
+
+def makechains(numexpiry=4, numstrike=200, expirygap=28, **kwargs):
+    """Synthetic chains of successive expiries of one underlying, as `(dfchain, info)` pairs."""
+    return [makechain(numstrike=numstrike, numday=expirygap * (i + 1), seed=i, **kwargs) for i in range(numexpiry)]
+
+def measure(func, repeat=3):
+    """Best wall time (s) over `repeat` runs after a warm-up run (lazy imports, JIT), and peak traced memory (MB)."""
+    func()
+    seconds = np.inf
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        seconds = min(seconds, time.perf_counter() - start)
+    tracemalloc.start()
+    try:
+        func()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return seconds, peak / 2 ** 20
+
+def getcases(size, scalarcap=500):
+    """
+    Benchmark cases at one chain size as {name: (element count, function)}.
+    Scalar per-object paths are capped at `scalarcap` elements; throughput keeps them comparable across sizes.
+    """
+    dfchain, info = makechain(numstrike=size)
+    spotprice = info[-1]
+    strikes = dfchain.index.to_numpy()
+    dfgex = getgex(dfchain, spotprice)
+    numscalar = min(size, scalarcap)
+    cprices = dfchain['c_close'].to_numpy()
+    tradedate = info[1]
+    duo = Opduo('C', spotprice, info[2], 0.2, 'C', spotprice * 1.05, info[2], 0.18, 'spread')
+    combo = Opcombo.fromduo(duo)
+    spots = spotprice * np.linspace(0.9, 1.1, size)
+    dates = np.arange(np.datetime64(tradedate), np.datetime64(info[2]))
+    return {
+        'BSModel': (numscalar, lambda: [BSModel(spotprice, k, 30, 0.2) for k in strikes[:numscalar]]),
+        'getBSArray': (2 * size, lambda: getBSArray(spotprice, strikes[:, None], 30, 0.2, 0, [True, False])),
+        'getIV': (numscalar, lambda: [getIV(spotprice, k, 30, p) for k, p in zip(strikes[:numscalar], cprices)
+                                      if p > max(spotprice - k, 0) + 0.01]),
+        'getIVArray': (size, lambda: getIVArray(spotprice, strikes, 30, cprices)),
+        'getgex': (size, lambda: getgex(dfchain, spotprice)),
+        'getnewgex': (size, lambda: getnewgex(dfgex, info, spotprice * 1.01)),
+        'get0gamma': (size * 20, lambda: get0gamma(dfchain, info, plot=False)),
+        'Opduo.getstratspec': (numscalar, lambda: [duo.getstratspec(s, tradedate) for s in spots[:numscalar]]),
+        'Opcombo.getstratarray': (size * dates.size, lambda: combo.getstratarray(spots[:, None], dates[None, :])),
+        'BSModel.getPayoffTable': (size, lambda: BSModel(spotprice, spotprice, 30, 0.2).getPayoffTable(
+            preExpiry=True, numPoint=size)),
+        'Opduo.getpayofftable': (size, lambda: duo.getpayofftable(True, numpoint=size)),
+    }
+
+def runbenchmark(sizes=(50, 500, 2000, 10000), repeat=3, scalarcap=500, cases=None):
+    """Time every benchmark case (or those named in `cases`) at each chain size; one row per case & size."""
+    rowlist = []
+    for size in sizes:
+        for name, (numelement, func) in getcases(size, scalarcap).items():
+            if cases is not None and name not in cases:
+                continue
+            seconds, peakmb = measure(func, repeat)
+            rowlist.append({'case': name, 'size': size, 'elements': numelement, 'seconds': seconds,
+                            'throughput': numelement / seconds, 'peakmb': peakmb})
+
+    return pd.DataFrame(rowlist)
+
+def savebaseline(dfbench, path):
+    """Save benchmark results as JSON baseline."""
+    with open(path, 'w') as file:
+        json.dump(dfbench.to_dict(orient='records'), file, indent=1)
+
+def checkregression(dfbench, path, threshold=0.25):
+    """
+    Compare results against a JSON baseline; raise AssertionError listing every case & size whose time or
+    peak memory grew by more than `threshold` (0.25 = 25%). Returns the merged comparison table.
+    """
+    with open(path) as file:
+        dfbase = pd.DataFrame(json.load(file))
+    dfcomp = dfbench.merge(dfbase[['case', 'size', 'seconds', 'peakmb']], on=['case', 'size'], suffixes=('', '_base'))
+    dfcomp['timeratio'] = dfcomp['seconds'] / dfcomp['seconds_base']
+    dfcomp['memratio'] = dfcomp['peakmb'] / dfcomp['peakmb_base'].clip(lower=1e-3)
+    dfslow = dfcomp[(dfcomp['timeratio'] > 1 + threshold) | (dfcomp['memratio'] > 1 + threshold)]
+    assert dfslow.empty, AssertionError('Performance regression:\n' + dfslow[['case', 'size', 'timeratio', 'memratio']]
+                                        .to_string(index=False))
+
+    return dfcomp
+
+if __name__ == '__main__':
+    import argparse
+    parser = argparse.ArgumentParser(description='Benchmark bsoption pricing, IV, GEX and strategy paths.')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[50, 500, 2000, 10000], help='chain sizes (strikes)')
+    parser.add_argument('--repeat', type=int, default=3, help='timing runs per case (best is kept)')
+    parser.add_argument('--cases', nargs='+', default=None, help='only run these cases')
+    parser.add_argument('--baseline', default=None, help='JSON baseline to check regressions against')
+    parser.add_argument('--threshold', type=float, default=0.25, help='allowed slowdown / memory growth')
+    parser.add_argument('--save', default=None, help='save results as JSON baseline')
+    args = parser.parse_args()
+
+    dfbench = runbenchmark(args.sizes, args.repeat, cases=args.cases)
+    print(dfbench.to_string(index=False))
+    if args.save:
+        savebaseline(dfbench, args.save)
+    if args.baseline:
+        try:
+            checkregression(dfbench, args.baseline, args.threshold)
+        except AssertionError as error:
+            print(error)
+            sys.exit(1)
@@ -3,12 +3,84 @@ codepath_bsoption = os.path.dirname(os.path.abspath(__file__))
 import sys
 sys.path.append('..')
 
+import math
+from collections import OrderedDict
+from contextlib import contextmanager
+
 import numpy as np
-import pandas as pd
-from scipy.stats import norm
 
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
+from bsoption import profiler
+
+# pandas & plotly are imported inside the table & plot functions, keeping the pricing core to NumPy only
+_SQRT2 = math.sqrt(2)
+_INVSQRT2PI = 1 / math.sqrt(2 * math.pi)
+_BACKEND = 'numpy'  # Compute backend of `getBSArray`, `getGammaArray` & `getIVArray`
+_CACHE = None  # Active `BSCache` of `useCache`
+
+def setBackend(backend='numpy', numThreads=None):
+    """
+    Select the compute backend of `getBSArray`, `getGammaArray` & `getIVArray`: 'numpy', or 'numba' for fused per-element kernels
+    run in parallel over `numThreads` threads. Falls back to 'numpy' when Numba is not installed.
+    Returns the active backend.
+    """
+    global _BACKEND
+    _BACKEND = _getBackend(backend)
+    if _BACKEND == 'numba' and numThreads:
+        from bsoption import kernels
+        kernels.numba.set_num_threads(numThreads)
+    return _BACKEND
+
+def _getBackend(backend=None):
+    """Resolve a per-call `backend` (default: the `setBackend` one), falling back to 'numpy' without Numba."""
+    backend = backend or _BACKEND
+    assert backend in ['numpy', 'numba'], AttributeError('backend must be numpy or numba!')
+    if backend == 'numba':
+        from bsoption import kernels
+        if not kernels.HAS_NUMBA:
+            import warnings
+            warnings.warn('Numba is not installed, keeping the NumPy backend.')
+            backend = 'numpy'
+    return backend
+
+def normPdf(x):
+    """Standard normal PDF of a scalar or array."""
+    if np.ndim(x) == 0:
+        return _INVSQRT2PI * math.exp(-0.5 * x * x)
+    return _INVSQRT2PI * np.exp(-0.5 * np.square(x))
+
+def normCdf(x):
+    """
+    Standard normal CDF of a scalar or array: `math.erfc` for scalars and, for arrays,
+    the double-precision rational approximation of Hart (1968) as given by West (2005).
+    """
+    if np.ndim(x) == 0:
+        return 0.5 * math.erfc(-x / _SQRT2)
+    x = np.asarray(x, dtype=float)
+    xabs = np.abs(x)
+    # Rational approximation within 7.07 sd (in-place Horner steps)
+    num = 0.0352624965998911 * xabs
+    for coef in (0.700383064443688, 6.37396220353165, 33.912866078383, 112.079291497871, 221.213596169931):
+        num += coef
+        num *= xabs
+    num += 220.206867912376
+    den = 0.0883883476483184 * xabs
+    for coef in (1.75566716318264, 16.064177579207, 86.7807322029461, 296.564248779674, 637.333633378831,
+                 793.826512519948):
+        den += coef
+        den *= xabs
+    den += 440.413735824752
+    tail = np.square(xabs)
+    tail *= -0.5
+    np.exp(tail, out=tail)
+    tail *= num
+    tail /= den
+    # Continued fraction in the far tails
+    far = xabs >= 7.07106781186547
+    if far.any():
+        xfar = xabs[far]
+        frac = xfar + 1 / (xfar + 2 / (xfar + 3 / (xfar + 4 / (xfar + 0.65))))
+        tail[far] = np.exp(-0.5 * np.square(xfar)) / frac / 2.506628274631
+    return np.where(x > 0, 1 - tail, tail)
 
 class BSModel():
     """
@@ -21,6 +93,7 @@ class BSModel():
         self.T = T / 365  # Number of days to expiry
         self.sig = sig  # IV ( 50% = 0.5)
         self.rf = rf  # risk-free rate
+        profiler.count('BSModel.objects')
         self.d1 = self.getZscore()[0]
         self.d2 = self.getZscore()[1]
         self.cPrice = self.getOpPrice('C')
@@ -29,8 +102,8 @@ class BSModel():
         self.pDelta = self.getDelta('P')
         self.cTheta = self.getTheta('C')
         self.pTheta = self.getTheta('P')
-        self.Vega = round(self.S * norm.pdf(self.d1) * (self.T ** 0.5) / 100, 6)
-        self.Gamma = round(norm.pdf(self.d1) / (self.S * self.sig * (self.T ** 0.5)), 9)
+        self.Vega = round(self.S * normPdf(self.d1) * (self.T ** 0.5) / 100, 6)
+        self.Gamma = round(normPdf(self.d1) / (self.S * self.sig * (self.T ** 0.5)), 9)
 
     def getZscore(self):
         """Compute two essential z-scores for option pricing."""
@@ -42,9 +115,9 @@ class BSModel():
         """Compute option price by Black-Scholes Model."""
         assert opType in ['C', 'P'], AttributeError('Must be call or put!')
         if opType == 'C':
-            opPrice = self.S * norm.cdf(self.d1, 0, 1) - self.K * np.exp(- self.rf * self.T) * norm.cdf(self.d2, 0, 1)
+            opPrice = self.S * normCdf(self.d1) - self.K * np.exp(- self.rf * self.T) * normCdf(self.d2)
         else:
-            opPrice = self.K * np.exp(- self.rf * self.T) * norm.cdf(-self.d2, 0, 1) - self.S * norm.cdf(-self.d1, 0, 1)
+            opPrice = self.K * np.exp(- self.rf * self.T) * normCdf(-self.d2) - self.S * normCdf(-self.d1)
 
         return round(opPrice, 4)
 
@@ -52,66 +125,213 @@ class BSModel():
         """Return call or put delta = inceremental change per unit increment in underlying."""
         assert opType in ['C', 'P'], AttributeError('Must be call or put!')
         if opType == 'C':
-            delta = norm.cdf(self.d1)
+            delta = normCdf(self.d1)
         else:
-            delta = norm.cdf(self.d1) - 1
+            delta = normCdf(self.d1) - 1
         return round(delta, 6)
 
     def getTheta(self, opType):
         """Return call or put theta = time value per day."""
         assert opType in ['C', 'P'], AttributeError('Must be call or put!')
         if opType == 'C':
-            t1 = - self.S * norm.pdf(self.d1) * self.sig / (2 * (self.T) ** 0.5)
-            t2 = self.rf * self.K * np.exp(- self.rf * self.T) * norm.cdf(self.d2)
+            t1 = - self.S * normPdf(self.d1) * self.sig / (2 * (self.T) ** 0.5)
+            t2 = self.rf * self.K * np.exp(- self.rf * self.T) * normCdf(self.d2)
         else:
-            t1 = - self.S * norm.pdf(self.d1) * self.sig / (2 * (self.T) ** 0.5)
-            t2 = self.rf * self.K * np.exp(- self.rf * self.T) * norm.cdf(- self.d2)
+            t1 = - self.S * normPdf(self.d1) * self.sig / (2 * (self.T) ** 0.5)
+            t2 = self.rf * self.K * np.exp(- self.rf * self.T) * normCdf(- self.d2)
         return round((t1 + t2) / 365, 6)
 
-    def getPayoff(self, numday=(7, 28, 56), Long=True, preExpiry=False):
-        """Obtain payoff diagram at expiry and (if `preExpiry` enabled) payoff of each given days before expiry."""
-        halfplus = lambda x: x if x > 0 else 0
+    def getPayoffTable(self, numday=(7, 28, 56), Long=True, preExpiry=False, numPoint=100):
+        """Obtain payoff table at expiry and (if `preExpiry` enabled) of each given days before expiry; no plot."""
         lowerBound = self.K * (1 - self.sig / 2)
         upperBound = self.K * (1 + self.sig / 2)
-        priceArray = np.linspace(lowerBound, upperBound, 100)
+        priceArray = np.linspace(lowerBound, upperBound, numPoint)
+        side = 1 if Long else -1
         # Payoff Dataframe: call & put at expiry
-        dfprice = pd.DataFrame(columns=['spot', 'expC', 'expP'])
-        dfprice['spot'] = priceArray
-        dfprice['expC'] = (dfprice['spot'] - self.K).apply(halfplus) * (1 if Long else -1)
-        dfprice['expP'] = (self.K - dfprice['spot']).apply(halfplus) * (1 if Long else -1)
-        # Add payoff plots
-        fig = make_subplots(rows=2, cols=1, shared_xaxes=True, vertical_spacing=0.05,
-                            row_heights=[0.5, 0.5], specs=[[{"type": "scatter"}]] * 2, subplot_titles=("Call", "Put"))
+        import pandas as pd
+        dfprice = pd.DataFrame({'spot': priceArray})
+        dfprice['expC'] = np.maximum(priceArray - self.K, 0) * side
+        dfprice['expP'] = np.maximum(self.K - priceArray, 0) * side
+        if preExpiry:
+            # Price grid of (spot x horizon) in one pass per side
+            dayArray = np.asarray(numday, dtype=float)
+            cPrice = np.round(getBSArray(priceArray[:, None], self.K, dayArray, self.sig, 0, True)[0], 2) * side
+            pPrice = np.round(getBSArray(priceArray[:, None], self.K, dayArray, self.sig, 0, False)[0], 2) * side
+            for i, day in enumerate(numday):
+                dfprice[f'{day}dayC'] = cPrice[:, i]
+                dfprice[f'{day}dayP'] = pPrice[:, i]
 
-        fig.add_trace(go.Scatter(x=dfprice['spot'], y=dfprice['expC'],
-                                 mode="lines", name="Call-Exp", line_color='#43b117'), row=1, col=1)
+        return dfprice
 
-        fig.add_trace(go.Scatter(x=dfprice['spot'], y=dfprice['expP'],
-                                 mode="lines", name="Put-Exp", line_color='#1756b1'), row=2, col=1)
+    def getPayoff(self, numday=(7, 28, 56), Long=True, preExpiry=False):
+        """Obtain payoff diagram at expiry and (if `preExpiry` enabled) payoff of each given days before expiry."""
+        dfprice = self.getPayoffTable(numday, Long, preExpiry)
+        plotPayoff(dfprice, Long)
+        return dfprice
 
-        if preExpiry:
-            for day in numday:
-                dfprice[f'{day}dayC'] = round(dfprice['spot'].apply(lambda x: BSModel(x, self.K, day, self.sig).cPrice), 2)
-                dfprice[f'{day}dayP'] = round(dfprice['spot'].apply(lambda x: BSModel(x, self.K, day, self.sig).pPrice), 2)
+@profiler.timed('plotting')
+def plotPayoff(dfprice, Long=True):
+    """Plot call & put payoff curves of a `BSModel.getPayoffTable` table."""
+    import plotly.graph_objects as go
+    from plotly.subplots import make_subplots
+    fig = make_subplots(rows=2, cols=1, shared_xaxes=True, vertical_spacing=0.05,
+                        row_heights=[0.5, 0.5], specs=[[{"type": "scatter"}]] * 2, subplot_titles=("Call", "Put"))
 
-                if not Long:
-                    dfprice[f'{day}dayC'] *= -1
-                    dfprice[f'{day}dayP'] *= -1
+    fig.add_trace(go.Scatter(x=dfprice['spot'], y=dfprice['expC'],
+                             mode="lines", name="Call-Exp", line_color='#43b117'), row=1, col=1)
 
-                fig.add_trace(go.Scatter(x=dfprice['spot'], y=dfprice[f'{day}dayC'],
-                                         mode="markers", name=f"Call-{day}D", line_color='#d516cc'), row=1, col=1)
+    fig.add_trace(go.Scatter(x=dfprice['spot'], y=dfprice['expP'],
+                             mode="lines", name="Put-Exp", line_color='#1756b1'), row=2, col=1)
 
-                fig.add_trace(go.Scatter(x=dfprice['spot'], y=dfprice[f'{day}dayP'],
-                                         mode="markers", name=f"Put-{day}D", line_color='#d51653'), row=2, col=1)
+    for col in dfprice.columns:
+        if col.endswith('dayC'):
+            fig.add_trace(go.Scatter(x=dfprice['spot'], y=dfprice[col],
+                                     mode="markers", name=f"Call-{col[:-4]}D", line_color='#d516cc'), row=1, col=1)
+        elif col.endswith('dayP'):
+            fig.add_trace(go.Scatter(x=dfprice['spot'], y=dfprice[col],
+                                     mode="markers", name=f"Put-{col[:-4]}D", line_color='#d51653'), row=2, col=1)
 
-        side = 'LONG' if Long else 'SHORT'
-        fig.update_layout(height=800, showlegend=False, title_text=f'{side}-side Payoff curve', title_x=0.5)
-        fig.show()
+    side = 'LONG' if Long else 'SHORT'
+    fig.update_layout(height=800, showlegend=False, title_text=f'{side}-side Payoff curve', title_x=0.5)
+    fig.show()
 
+class LazyBSModel():
+    """
+    Lightweight `BSModel`: z-scores are computed once and each price or greek only on first access, then cached.
+    Attribute names follow `BSModel`; rounding to `BSModel` decimals is opt-in via `rounding=True`.
+    """
+
+    __slots__ = ('S', 'K', 'T', 'sig', 'rf', 'rounding', 'd1', 'd2', '_Cprice', '_Pprice', '_Cdelta', '_Pdelta',
+                 '_Ctheta', '_Ptheta', '_vega', '_gamma')
+
+    def __init__(self, S, K, T, sig, rf=0, rounding=False):
+        self.S = S  # Underlying price
+        self.K = K  # Strike price
+        self.T = T / 365  # Number of days to expiry
+        self.sig = sig  # IV ( 50% = 0.5)
+        self.rf = rf  # risk-free rate
+        self.rounding = rounding  # Round to `BSModel` decimals
+        profiler.count('LazyBSModel.objects')
+        sigt = sig * (self.T ** 0.5)
+        self.d1 = (np.log(S / K) + self.T * (rf + 0.5 * (sig ** 2))) / sigt
+        self.d2 = self.d1 - sigt
+
+    def _get(self, key, func, digit):
+        """Evaluate a price or greek once and cache it in its slot."""
+        try:
+            return getattr(self, key)
+        except AttributeError:  # Slot not yet filled
+            value = func()
+            if self.rounding:
+                value = round(value, digit)
+            setattr(self, key, value)
+            return value
+
+    def getZscore(self):
+        """Return the two z-scores for option pricing."""
+        return self.d1, self.d2
+
+    def getOpPrice(self, opType):
+        """Compute option price by Black-Scholes Model."""
+        assert opType in ['C', 'P'], AttributeError('Must be call or put!')
+        if opType == 'C':
+            func = lambda: self.S * normCdf(self.d1) - self.K * np.exp(- self.rf * self.T) * normCdf(self.d2)
+        else:
+            func = lambda: self.K * np.exp(- self.rf * self.T) * normCdf(-self.d2) - self.S * normCdf(-self.d1)
+        return self._get(f'_{opType}price', func, 4)
+
+    def getDelta(self, opType):
+        """Return call or put delta = inceremental change per unit increment in underlying."""
+        assert opType in ['C', 'P'], AttributeError('Must be call or put!')
+        func = lambda: normCdf(self.d1) - (0 if opType == 'C' else 1)
+        return self._get(f'_{opType}delta', func, 6)
+
+    def getTheta(self, opType):
+        """Return call or put theta = time value per day."""
+        assert opType in ['C', 'P'], AttributeError('Must be call or put!')
+        def func():
+            t1 = - self.S * normPdf(self.d1) * self.sig / (2 * (self.T) ** 0.5)
+            t2 = self.rf * self.K * np.exp(- self.rf * self.T) * normCdf(self.d2 if opType == 'C' else - self.d2)
+            return (t1 + t2) / 365
+        return self._get(f'_{opType}theta', func, 6)
+
+    cPrice = property(lambda self: self.getOpPrice('C'))
+    pPrice = property(lambda self: self.getOpPrice('P'))
+    cDelta = property(lambda self: self.getDelta('C'))
+    pDelta = property(lambda self: self.getDelta('P'))
+    cTheta = property(lambda self: self.getTheta('C'))
+    pTheta = property(lambda self: self.getTheta('P'))
+    Vega = property(lambda self: self._get('_vega', lambda: self.S * normPdf(self.d1) * (self.T ** 0.5) / 100, 6))
+    Gamma = property(lambda self: self._get('_gamma', lambda: normPdf(self.d1) / (self.S * self.sig * (self.T ** 0.5)), 9))
+
+@profiler.timed('pricing', lambda result: result[0].size)
+def getBSArray(S, K, T, sig, rf=0, isCall=True, backend=None):
+    """
+    Price a batch of European options over broadcastable arrays in one pass.
+    Units follow `BSModel`: `T` in days, `sig` as decimal (50% = 0.5), theta per day and vega per 1% of IV.
+    Returns unrounded (price, delta, theta, vega, gamma) arrays; expired or zero-IV options take intrinsic values.
+    `backend` overrides the one chosen by `setBackend`.
+    """
+    if _getBackend(backend) == 'numba':
+        from bsoption.kernels import bsarray
+        return bsarray(S, K, T, sig, rf, isCall)
+    S, K, T, sig, rf, isCall = np.broadcast_arrays(*[np.asarray(x, dtype=float) for x in (S, K, T, sig, rf)],
+                                                   np.asarray(isCall, dtype=bool))
+    t = T / 365
+    live = (t > 0) & (sig > 0)  # Options with time value
+    with np.errstate(divide='ignore', invalid='ignore'):
+        sigt = sig * np.sqrt(t)
+        d1 = (np.log(S / K) + t * (rf + 0.5 * sig ** 2)) / sigt
+        d2 = d1 - sigt
+        disc = K * np.exp(- rf * t)  # Discounted strike
+        sign = np.where(isCall, 1.0, -1.0)  # Puts take mirrored z-scores, N(-d)
+        pdf1 = normPdf(d1)
+        cdf1 = normCdf(sign * d1)
+        cdf2 = normCdf(sign * d2)
+        price = sign * (S * cdf1 - disc * cdf2)
+        delta = sign * cdf1
+        theta = (- S * pdf1 * sig / (2 * np.sqrt(t)) + rf * disc * cdf2) / 365
+        vega = S * pdf1 * np.sqrt(t) / 100
+        gamma = pdf1 / (S * sigt)
+    if not live.all():
+        # Expired or zero-IV options: intrinsic value against discounted strike, step delta, no other greeks
+        intrinsic = np.where(isCall, S - disc, disc - S)
+        price = np.where(live, price, np.maximum(intrinsic, 0))
+        delta = np.where(live, delta, np.where(intrinsic > 0, np.where(isCall, 1.0, -1.0), 0.0))
+        theta = np.where(live, theta, 0.0)
+        vega = np.where(live, vega, 0.0)
+        gamma = np.where(live, gamma, 0.0)
+
+    return tuple(np.asarray(x, order='C') for x in (price, delta, theta, vega, gamma))
+
+@profiler.timed('pricing', lambda result: result.size)
+def getGammaArray(S, K, T, sig, rf=0, backend=None):
+    """
+    Compute unrounded gamma only over broadcastable arrays (same for call & put); zero for expired or zero-IV options.
+    `backend` overrides the one chosen by `setBackend`.
+    """
+    if _getBackend(backend) == 'numba':
+        from bsoption.kernels import gammaarray
+        return gammaarray(S, K, T, sig, rf)
+    S, K, T, sig, rf = np.broadcast_arrays(*[np.asarray(x, dtype=float) for x in (S, K, T, sig, rf)])
+    t = T / 365
+    with np.errstate(divide='ignore', invalid='ignore'):
+        sigt = sig * np.sqrt(t)
+        d1 = (np.log(S / K) + t * (rf + 0.5 * sig ** 2)) / sigt
+        gamma = normPdf(d1) / (S * sigt)
+    return np.where((t > 0) & (sig > 0), gamma, 0.0)
+
+@profiler.timed('iv', 1)
 def getIV(S, K, T, P, opType='C', rf=0, minIV=0, maxIV=400.0, maxStep=20, pctError=0.001):
-    """Obtain an estimate of IV by bisection method."""
-    BSstart = BSModel(S, K, T, minIV / 100, rf)  # Lower estimate of original option price
-    BSend = BSModel(S, K, T, maxIV / 100, rf)  # Upper estimate of original option price
+    """Obtain an estimate of IV by bisection method (looked up in the active `useCache` cache, if any)."""
+    if _CACHE is not None:
+        return _CACHE.getIV(S, K, T, P, opType, rf, minIV, maxIV, maxStep, pctError)
+    return _bisectIV(S, K, T, P, opType, rf, minIV, maxIV, maxStep, pctError)
+
+def _bisectIV(S, K, T, P, opType='C', rf=0, minIV=0, maxIV=400.0, maxStep=20, pctError=0.001):
+    """Bisection loop of `getIV`."""
+    BSstart = LazyBSModel(S, K, T, minIV / 100, rf, rounding=True)  # Lower estimate of original option price
+    BSend = LazyBSModel(S, K, T, maxIV / 100, rf, rounding=True)  # Upper estimate of original option price
     assert opType in ['C', 'P'], AttributeError('Must be call or put!')
     minPrice = BSstart.getOpPrice(opType)
     maxPrice = BSend.getOpPrice(opType)
@@ -131,7 +351,7 @@ def getIV(S, K, T, P, opType='C', rf=0, minIV=0, maxIV=400.0, maxStep=20, pctErr
                 break
             else:  # Take mid-point of current interval and cut interval in half
                 sig = (minIV + maxIV) / 2
-                newPrice = BSModel(S, K, T, sig / 100, rf).getOpPrice(opType)
+                newPrice = LazyBSModel(S, K, T, sig / 100, rf, rounding=True).getOpPrice(opType)
                 if newPrice > P:
                     maxIV = sig
                     maxPrice = newPrice
@@ -140,11 +360,214 @@ def getIV(S, K, T, P, opType='C', rf=0, minIV=0, maxIV=400.0, maxStep=20, pctErr
                     minPrice = newPrice
 
                 step += 1
+        profiler.count('getIV.steps', step - 1)
+        if step > maxStep:
+            profiler.count('getIV.nonconverged')
 
     return round(sig, 2)
 
+@profiler.timed('iv', lambda result: result[0].size)
+def getIVArray(S, K, T, P, isCall=True, rf=0, minIV=0, maxIV=400.0, maxStep=50, tol=1e-8, backend=None):
+    """
+    Solve IV (in %, as `getIV`) for a batch of option prices over broadcastable arrays.
+    Vega-guided Newton steps are kept inside a per-option bisection bracket [minIV, maxIV]; options stop iterating
+    once the price residual is within `tol`. Prices outside no-arbitrage bounds (or the IV bracket) give NaN.
+    Returns unrounded (iv, nstep, resid) arrays: IV, iterations taken and final model-minus-market price.
+    `backend` overrides the one chosen by `setBackend`.
+    """
+    if _getBackend(backend) == 'numba':
+        from bsoption.kernels import ivarray
+        return ivarray(S, K, T, P, isCall, rf, minIV, maxIV, maxStep, tol)
+    S, K, T, P, rf, isCall = np.broadcast_arrays(*[np.asarray(x, dtype=float) for x in (S, K, T, P, rf)],
+                                                 np.asarray(isCall, dtype=bool))
+    shape = S.shape
+    S, K, T, P, rf, isCall = [x.ravel() for x in (S, K, T, P, rf, isCall)]
+    iv = np.full(S.size, np.nan)
+    nstep = np.zeros(S.size, dtype=int)
+    resid = np.full(S.size, np.nan)
+    # No-arbitrage bounds: intrinsic value against discounted strike up to spot (call) or discounted strike (put)
+    disc = K * np.exp(- rf * T / 365)
+    lowb = np.maximum(np.where(isCall, S - disc, disc - S), 0)
+    upb = np.where(isCall, S, disc)
+    valid = np.isfinite(P) & (P >= lowb - tol) & (P < upb)
+    # Expired or priced at intrinsic value: zero time value
+    flat = valid & ((T <= 0) | (P <= lowb + tol))
+    iv[flat] = minIV
+    resid[flat] = P[flat] - lowb[flat]
+    idx = np.flatnonzero(valid & ~flat)
+    # Bracket in decimal IV; drop prices the bracket cannot reach
+    lo = np.full(idx.size, minIV / 100)
+    hi = np.full(idx.size, maxIV / 100)
+    Sa, Ka, Ta, Pa, rfa, ca = S[idx], K[idx], T[idx], P[idx], rf[idx], isCall[idx]
+    reach = getBSArray(Sa, Ka, Ta, hi, rfa, ca, backend='numpy')[0] >= Pa
+    idx, lo, hi, Sa, Ka, Ta, Pa, rfa, ca = [x[reach] for x in (idx, lo, hi, Sa, Ka, Ta, Pa, rfa, ca)]
+    # Initial guess (Manaster-Koehler), falling back to Brenner-Subrahmanyam when at the money
+    t = Ta / 365
+    sig = np.sqrt(2 * np.abs(np.log(Sa / (Ka * np.exp(- rfa * t)))) / t)
+    sig = np.where(sig > 0, sig, np.sqrt(2 * np.pi / t) * Pa / Sa)
+    sig = np.clip(sig, lo + 0.01 * (hi - lo), hi - 0.01 * (hi - lo))
+
+    for step in range(maxStep):
+        price, _, _, vega, _ = getBSArray(Sa, Ka, Ta, sig, rfa, ca, backend='numpy')
+        diff = price - Pa
+        nstep[idx] += 1
+        # Retire converged options
+        done = np.abs(diff) <= tol
+        iv[idx[done]] = sig[done] * 100
+        resid[idx[done]] = diff[done]
+        keep = ~done
+        idx, lo, hi, sig, diff, vega, Sa, Ka, Ta, Pa, rfa, ca = [x[keep] for x in
+                                                                  (idx, lo, hi, sig, diff, vega, Sa, Ka, Ta, Pa, rfa, ca)]
+        if not idx.size:
+            break
+        # Shrink bracket, take Newton step, bisect where the step leaves the bracket
+        hi = np.where(diff > 0, sig, hi)
+        lo = np.where(diff > 0, lo, sig)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            newsig = sig - diff / (vega * 100)
+        inside = np.isfinite(newsig) & (newsig > lo) & (newsig < hi)
+        sig = np.where(inside, newsig, (lo + hi) / 2)
+    profiler.count('getIVArray.steps', nstep.sum())
+    # Options not converged within `maxStep`: report last iterate and its residual
+    if idx.size:
+        profiler.count('getIVArray.nonconverged', idx.size)
+        iv[idx] = sig * 100
+        resid[idx] = getBSArray(Sa, Ka, Ta, sig, rfa, ca, backend='numpy')[0] - Pa
+
+    return iv.reshape(shape), nstep.reshape(shape), resid.reshape(shape)
+
+class BSCache():
+    """
+    Bounded LRU cache of option prices & greeks and IV solves, keyed on inputs quantized to `decimals` (exact if None).
+    Misses are evaluated at the quantized inputs, so a hit returns exactly what a fresh evaluation of the key would.
+    Scalar entries and `getIVArray` rows are kept in separate stores of up to `maxSize` entries each; the row
+    store is a sorted array of byte keys searched in one vectorized pass per batch.
+    """
+
+    def __init__(self, maxSize=100000, decimals=None):
+        self.maxSize = maxSize  # Maximum number of cached entries
+        self.decimals = decimals  # Decimals of input quantization
+        self.store = OrderedDict()  # Entries in least- to most-recently used order
+        self._clearRows()
+        self.hits = 0
+        self.misses = 0
+
+    def _clearRows(self):
+        """Empty the `getIVArray` row store."""
+        self.rowKeys = np.empty(0, dtype=np.dtype((np.void, 80)))  # Sorted byte keys of quantized input rows
+        self.rowValues = np.empty((0, 3))  # (iv, nstep, resid) of each key
+        self.rowUsed = np.empty(0, dtype=np.int64)  # Batch number of last use of each key
+        self.batch = 0
+
+    def _quantize(self, *args):
+        """Round numeric inputs to `decimals`."""
+        if self.decimals is None:
+            return args
+        return tuple(round(x, self.decimals) if isinstance(x, (float, np.floating)) else x for x in args)
+
+    def _lookup(self, key, func):
+        """Return cached value of `key`, or evaluate `func`, store it and evict the least recently used entry."""
+        try:
+            value = self.store[key]
+        except KeyError:
+            self.misses += 1
+            value = self.store[key] = func()
+            if len(self.store) > self.maxSize:
+                self.store.popitem(last=False)
+            return value
+        self.hits += 1
+        self.store.move_to_end(key)
+        return value
+
+    def getGreeks(self, S, K, T, sig, rf=0, opType='C'):
+        """Cached unrounded (price, delta, theta, vega, gamma) of one option, as `getBSArray`."""
+        assert opType in ['C', 'P'], AttributeError('Must be call or put!')
+        key = ('BS',) + self._quantize(S, K, T, sig, rf) + (opType,)
+        return self._lookup(key, lambda: tuple(float(x) for x in getBSArray(*key[1:6], opType == 'C')))
+
+    def getIV(self, S, K, T, P, opType='C', rf=0, minIV=0, maxIV=400.0, maxStep=20, pctError=0.001):
+        """Cached `getIV` of one option price."""
+        key = ('IV',) + self._quantize(S, K, T, P, rf) + (opType, minIV, maxIV, maxStep, pctError)
+        return self._lookup(key, lambda: _bisectIV(*key[1:5], opType, key[5], minIV, maxIV, maxStep, pctError))
+
+    def getIVArray(self, S, K, T, P, isCall=True, rf=0, minIV=0, maxIV=400.0, maxStep=50, tol=1e-8):
+        """
+        Cached `getIVArray`: rows of quantized inputs are looked up as byte keys by binary search over the whole
+        batch, and all misses are solved in one batch. Rows with non-finite inputs are solved but never stored.
+        """
+        arrays = np.broadcast_arrays(*[np.asarray(x, dtype=float) for x in (S, K, T, P, rf)],
+                                     np.asarray(isCall, dtype=float))
+        shape = arrays[0].shape
+        rows = np.empty((arrays[0].size, 10))
+        for j, x in enumerate(arrays):
+            rows[:, j] = x.ravel()
+        if self.decimals is not None:
+            np.round(rows[:, :5], self.decimals, out=rows[:, :5])
+        rows[:, 6:] = (minIV, maxIV, maxStep, tol)
+        rows += 0.0  # -0.0 to 0.0, so equal values share one key
+        keys = rows.view(self.rowKeys.dtype).ravel()
+        pos = np.minimum(np.searchsorted(self.rowKeys, keys), max(self.rowKeys.size - 1, 0))
+        found = (self.rowKeys[pos] == keys) if self.rowKeys.size else np.zeros(keys.size, dtype=bool)
+        solved = np.empty((keys.size, 3))
+        solved[found] = self.rowValues[pos[found]]
+        self.batch += 1
+        self.rowUsed[pos[found]] = self.batch
+        missing = np.flatnonzero(~found)
+        if missing.size:
+            finite = np.isfinite(rows[missing]).all(axis=1)
+            # Distinct missing keys solved once, at the quantized inputs
+            newKeys, first, inverse = np.unique(keys[missing[finite]], return_index=True, return_inverse=True)
+            solverows = np.concatenate([rows[missing[finite]][first], rows[missing[~finite]]])
+            values = np.column_stack(getIVArray(*solverows[:, :4].T, solverows[:, 5].astype(bool), solverows[:, 4],
+                                                minIV, maxIV, maxStep, tol))
+            solved[missing[finite]] = values[inverse.ravel()]
+            solved[missing[~finite]] = values[newKeys.size:]
+            self._storeRows(newKeys, values[:newKeys.size])
+        self.hits += keys.size - missing.size
+        self.misses += missing.size
+        return (solved[:, 0].reshape(shape), solved[:, 1].astype(np.int64).reshape(shape), solved[:, 2].reshape(shape))
+
+    def _storeRows(self, newKeys, newValues):
+        """Merge new row keys into the sorted row store, evicting the least recently used beyond `maxSize`."""
+        keys = np.concatenate([self.rowKeys, newKeys])
+        values = np.concatenate([self.rowValues, newValues])
+        used = np.concatenate([self.rowUsed, np.full(newKeys.size, self.batch)])
+        if keys.size > self.maxSize:
+            keep = np.argpartition(used, keys.size - self.maxSize)[keys.size - self.maxSize:]
+            keys, values, used = keys[keep], values[keep], used[keep]
+        order = np.argsort(keys)
+        self.rowKeys, self.rowValues, self.rowUsed = keys[order], values[order], used[order]
+
+    def getStats(self):
+        """Hit/miss statistics."""
+        total = self.hits + self.misses
+        return {'hits': self.hits, 'misses': self.misses, 'size': len(self.store) + self.rowKeys.size,
+                'maxSize': self.maxSize,
+                'hitRate': self.hits / total if total else 0.0}
+
+    def clear(self):
+        """Empty the cache and reset statistics, e.g. between market snapshots."""
+        self.store.clear()
+        self._clearRows()
+        self.hits = 0
+        self.misses = 0
+
+@contextmanager
+def useCache(cache=None, maxSize=100000, decimals=None):
+    """Route `getIV` through a `BSCache` (a new one unless given) within the `with` block; yields the cache."""
+    global _CACHE
+    previous = _CACHE
+    _CACHE = cache if cache is not None else BSCache(maxSize, decimals)
+    try:
+        yield _CACHE
+    finally:
+        _CACHE = previous
+
+@profiler.timed('plotting')
 def getOptionTimecurve(dfOpPrice, priceField='price', spotField='ftClose', includeExpiry=True):
     """Obtain option price curve depending on timestamp."""
+    import plotly.graph_objects as go
+    from plotly.subplots import make_subplots
     fig = make_subplots(rows=7, cols=1, shared_xaxes=True, vertical_spacing=0.05,
                         row_heights=[0.25, 0.15, 0.1, 0.1, 0.1, 0.1, 0.1], specs=[[{"type": "scatter"}]] * 7,
                         subplot_titles=("Option price", "Underlying", "IV", "Delta", "Theta", "Vega", "Gamma"))
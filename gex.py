@@ -3,16 +3,27 @@ codepath_bsoption = os.path.dirname(os.path.abspath(__file__))
 import sys
 sys.path.append('..')
 
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
 import numpy as np
 import pandas as pd
 
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
-
-from bsoption.bsmodel import BSModel
+from bsoption import profiler
+from bsoption.bsmodel import getBSArray, getGammaArray
+from bsoption.optionchain import OptionChain
 
+@profiler.timed('gex', len)
 def getgex(dfchain, spotprice, ptfactor=100, decplace=4, oifield='oi'):
-    """Obtain gamma exposure of each option contract per 1% move of underlying."""
+    """
+    Obtain gamma exposure of each option contract per 1% move of underlying.
+    An `OptionChain` (whose OI was picked at `OptionChain.fromframe`) gives only the GEX columns, by strike.
+    """
+    if isinstance(dfchain, OptionChain):
+        assert oifield == 'oi', AttributeError('OptionChain holds one OI field: set it in OptionChain.fromframe!')
+        scale = ptfactor * spotprice / 100
+        cgex, pgex = dfchain.c_gamma * dfchain.c_oi * scale, - dfchain.p_gamma * dfchain.p_oi * scale
+        return pd.DataFrame({'c_GEX': np.round(cgex, decplace), 'p_GEX': np.round(pgex, decplace),
+                             'GEX': np.round(cgex + pgex, decplace)}, index=pd.Index(dfchain.strike, name='strike'))
     dfgex = dfchain.copy()
     dfgex['c_GEX'] = dfgex['c_gamma'] * dfgex[f'c_{oifield}'] * ptfactor * spotprice / 100
     dfgex['p_GEX'] = -dfgex['p_gamma'] * dfgex[f'p_{oifield}'] * ptfactor * spotprice / 100
@@ -22,36 +33,112 @@ def getgex(dfchain, spotprice, ptfactor=100, decplace=4, oifield='oi'):
 
     return dfgex
 
-def getnewgex(dfgex, info, spotprice, ptfactor=100, decplace=4, oifield='oi'):
-    """Obtain total GEX of an option chain with arbitary underlying price."""
+@profiler.timed('gex', len)
+def getnewgex(dfgex, info, spotprice, ptfactor=100, decplace=4, oifield='oi', surface=None, mode='sticky-strike'):
+    """
+    Obtain total GEX of an option chain with arbitary underlying price.
+    IVs are held per strike, or read from a `VolSurface` under `mode` ('sticky-strike' / 'sticky-moneyness').
+    """
     # Alter underlying price
     dfnewgex = dfgex.copy()
-    # Recompute option price, delta and gamma
-    dfnewgex.reset_index(inplace=True)
+    # Recompute option price, delta and gamma in one vectorized pass per side
+    strikes = dfnewgex.index.to_numpy(dtype=float)
     tdays = (info[2] - info[1]).days
-    colbs_c = dfnewgex.apply(lambda row: BSModel(spotprice, row['strike'], tdays, row['c_iv'] / 100), axis=1)
-    dfnewgex['c_close'] = np.round(colbs_c.apply(lambda x: x.cprice), 2)
-    dfnewgex['c_delta'] = np.round(colbs_c.apply(lambda x: x.cdelta), 4)
-    dfnewgex['c_gamma'] = colbs_c.apply(lambda x: x.gamma)
-    colbs_p = dfnewgex.apply(lambda row: BSModel(spotprice, row['strike'], tdays, row['p_iv'] / 100), axis=1)
-    dfnewgex['p_close'] = np.round(colbs_p.apply(lambda x: x.pprice), 2)
-    dfnewgex['p_delta'] = np.round(colbs_p.apply(lambda x: x.pdelta), 4)
-    dfnewgex['p_gamma'] = colbs_p.apply(lambda x: x.gamma)
+    if surface is not None:
+        dfnewgex['c_iv'] = dfnewgex['p_iv'] = surface.getiv(spotprice, strikes, tdays, mode)
+    cprice, cdelta, _, _, cgamma = getBSArray(spotprice, strikes, tdays, dfnewgex['c_iv'].to_numpy() / 100, 0, True)
+    dfnewgex['c_close'] = np.round(cprice, 2)
+    dfnewgex['c_delta'] = np.round(cdelta, 4)
+    dfnewgex['c_gamma'] = cgamma
+    pprice, pdelta, _, _, pgamma = getBSArray(spotprice, strikes, tdays, dfnewgex['p_iv'].to_numpy() / 100, 0, False)
+    dfnewgex['p_close'] = np.round(pprice, 2)
+    dfnewgex['p_delta'] = np.round(pdelta, 4)
+    dfnewgex['p_gamma'] = pgamma
     # GEX
     dfnewgex['c_GEX'] = np.round(dfnewgex['c_gamma'] * dfnewgex[f'c_{oifield}'] * ptfactor * spotprice / 100, decplace)
     dfnewgex['p_GEX'] = np.round(dfnewgex['p_gamma'] * dfnewgex[f'p_{oifield}'] * ptfactor * -1 * spotprice / 100, decplace)
     dfnewgex['GEX'] = np.round(dfnewgex['c_GEX'] + dfnewgex['p_GEX'], decplace)
-    # Set back `strike` as index
-    dfnewgex.set_index('strike', inplace=True)
 
     return dfnewgex
 
+def _gexinputs(dfchain, info, oifield='oi'):
+    """Extract strike, IV (decimal) and OI arrays plus days to expiry of an option chain (DataFrame or `OptionChain`)."""
+    if isinstance(dfchain, OptionChain):
+        assert oifield == 'oi', AttributeError('OptionChain holds one OI field: set it in OptionChain.fromframe!')
+        # Strike & OI arrays are used as stored (no copy when float64)
+        tdays = (info[2] - info[1]).days
+        return (dfchain.strike.astype(float, copy=False), np.divide(dfchain.c_iv, 100, dtype=float),
+                np.divide(dfchain.p_iv, 100, dtype=float),
+                dfchain.c_oi.astype(float, copy=False), dfchain.p_oi.astype(float, copy=False), tdays)
+    strikes = dfchain.index.to_numpy(dtype=float)
+    civ = dfchain['c_iv'].to_numpy(dtype=float) / 100
+    piv = dfchain['p_iv'].to_numpy(dtype=float) / 100
+    coi = dfchain[f'c_{oifield}'].to_numpy(dtype=float)
+    poi = dfchain[f'p_{oifield}'].to_numpy(dtype=float)
+    tdays = (info[2] - info[1]).days
+    return strikes, civ, piv, coi, poi, tdays
+
+@profiler.timed('gex', lambda result: result[0].size)
+def _gexmatrix(spotlevels, strikes, civ, piv, coi, poi, tdays, ptfactor=100, maxcells=2 ** 22, surface=None,
+               mode='sticky-strike'):
+    """
+    Total call-GEX & put-GEX at each spot level from the (spot levels x strikes) gamma matrix.
+    With a `VolSurface`, IVs of both sides are read from it at each spot level under `mode`.
+    """
+    levels = np.atleast_1d(np.asarray(spotlevels, dtype=float))
+    cgex = np.empty(levels.size)
+    pgex = np.empty(levels.size)
+    # Row chunks keep the gamma matrix within `maxcells` elements for dense spot grids
+    step = max(1, maxcells // max(1, strikes.size))
+    for i in range(0, levels.size, step):
+        spot = levels[i:i + step, None]
+        scale = ptfactor * spot[:, 0] / 100
+        csig, psig = civ, piv
+        if surface is not None:
+            csig = psig = surface.getiv(spot, strikes, tdays, mode) / 100
+        cgex[i:i + step] = getGammaArray(spot, strikes, tdays, csig) @ coi * scale
+        pgex[i:i + step] = - (getGammaArray(spot, strikes, tdays, psig) @ poi) * scale
+    return cgex, pgex
+
+def getgexprofile(dfchain, info, spotlevels, ptfactor=100, oifield='oi', surface=None, mode='sticky-strike'):
+    """
+    Obtain call-GEX, put-GEX and net GEX of an option chain over an array of underlying price levels,
+    optionally with IVs from a `VolSurface` under `mode`.
+    """
+    cgex, pgex = _gexmatrix(spotlevels, *_gexinputs(dfchain, info, oifield), ptfactor, surface=surface, mode=mode)
+    dfsumgex = pd.DataFrame({'c_GEX': np.round(cgex, 2), 'p_GEX': np.round(pgex, 2), 'GEX': np.round(cgex + pgex, 2)},
+                            index=np.asarray(spotlevels, dtype=float))
+    return dfsumgex
+
+def getzerogamma(gexfunc, spotlevels, netgex, xtol=1e-4):
+    """
+    Locate the first zero of a net-GEX curve: an exact zero at a spot level or a sign change between two levels
+    (refined by Brent's method), whichever comes first. None if the curve has no nonzero values or no zero.
+    """
+    from scipy.optimize import brentq  # Lazy import kept outside the timed stage
+    with profiler.stage('zerogamma'):
+        levels = np.asarray(spotlevels, dtype=float)
+        netgex = np.asarray(netgex, dtype=float)
+        if not netgex.any():  # Flat curve, e.g. zero gamma everywhere on expiry day
+            return None
+        zero = np.flatnonzero(netgex == 0)
+        cross = np.flatnonzero(netgex[:-1] * netgex[1:] < 0)
+        if zero.size and (not cross.size or zero[0] <= cross[0]):
+            return round(levels[zero[0]], 2)
+        if not cross.size:
+            return None
+        i = cross[0]
+        return round(brentq(gexfunc, levels[i], levels[i + 1], xtol=xtol), 2)
+
 def gettotalgex(dfgex):
     """Obtain call-GEX, put-GEX and total-GEX."""
     return round(dfgex['c_GEX'].sum(), 2), round(dfgex['p_GEX'].sum(), 2), round(dfgex['GEX'].sum(), 2)
 
+@profiler.timed('plotting')
 def plotgex(dfgex, info):
     """Plot call GEX, put GEX and net GEX."""
+    import plotly.graph_objects as go
+    from plotly.subplots import make_subplots
     tdstr = info[1].strftime('%Y-%m-%d')
     expiry = info[2].strftime('%Y-%m-%d')
     spotprice = info[-1]
@@ -78,54 +165,208 @@ def plotgex(dfgex, info):
     fig.update_layout(title=titletext, title_x=0.5, width=1000, height=800)
     fig.show()
 
-def get0gamma(dfchain, info, ptfactor=100, rangefactor=0.125, gridfactor=0.0125, plot=True):
-    """Obtain zero gamma level."""
-    # GEX according to true underlying price
+def _gexlevels(gexinputs, spotlevels, cgex, pgex, ptfactor=100, surface=None, mode='sticky-strike'):
+    """GEX profile table over spot levels and the zero gamma level found within it, from `_gexinputs` arrays."""
+    dfsumgex = pd.DataFrame({'c_GEX': np.round(cgex, 2), 'p_GEX': np.round(pgex, 2), 'GEX': np.round(cgex + pgex, 2)},
+                            index=spotlevels)
+    # Obtain zero gamma level by root finding on the net GEX curve
+    gexfunc = lambda level: sum(_gexmatrix(level, *gexinputs, ptfactor, surface=surface, mode=mode))[0]
+    return dfsumgex, getzerogamma(gexfunc, spotlevels, cgex + pgex)
+
+def get0gamma(dfchain, info, ptfactor=100, rangefactor=0.125, gridfactor=0.0125, plot=True, oifield='oi',
+              surface=None, mode='sticky-strike'):
+    """Obtain zero gamma level; spot levels take IVs from `surface` under `mode` if given."""
     spotprice = info[-1]
-    dfgex = getgex(dfchain, spotprice)
-    cgex0, pgex0, ngex0 = gettotalgex(dfgex)
     # Grid of spot price levels (in geometric sequence)
     exprange = np.arange(-rangefactor, rangefactor, gridfactor)
-    spotlevels = [spotprice * np.exp(exp) for exp in exprange]
-
-    # Obtain GEX for all spot price levels
-    dfsumgex = pd.DataFrame()
-    for level in spotlevels:
-        dfnewgex = getnewgex(dfgex, info, level, ptfactor)
-        cgex, pgex, ngex = gettotalgex(dfnewgex)
-        dfsumgex.loc[level, 'c_GEX'] = cgex
-        dfsumgex.loc[level, 'p_GEX'] = pgex
-        dfsumgex.loc[level, 'GEX'] = ngex
-    # Obtain zero gamma level by linear interpolation
-    if (dfsumgex['GEX'].min() * dfsumgex['GEX'].max()) > 0:
-        zerogexlevel = None
-    else:
-        for p1, p2 in zip(dfsumgex.index[:-1], dfsumgex.index[1:]):
-            level1 = dfsumgex.loc[p1, 'GEX']
-            level2 = dfsumgex.loc[p2, 'GEX']
-            if level1 * level2 < 0:
-                zerogexlevel = round((p1 * level2 - p2 * level1) / (level2 - level1), 2)
-                break
-            else:
-                zerogexlevel = p2
+    spotlevels = spotprice * np.exp(exprange)
+    # Obtain GEX for all spot price levels at once
+    gexinputs = _gexinputs(dfchain, info, oifield)
+    cgex, pgex = _gexmatrix(spotlevels, *gexinputs, ptfactor, surface=surface, mode=mode)
+    dfsumgex, zerogexlevel = _gexlevels(gexinputs, spotlevels, cgex, pgex, ptfactor, surface, mode)
     # Visualize GEX at different spot price
     if plot:
-        fig = make_subplots(rows=1, cols=1, shared_xaxes=True, row_heights=[6.0], specs=[[{"type": "scatter"}]])
+        # GEX according to true underlying price
+        ngex0 = gettotalgex(getgex(dfchain, spotprice, ptfactor, oifield=oifield))[2]
+        with profiler.stage('plotting'):
+            import plotly.graph_objects as go
+            from plotly.subplots import make_subplots
+            fig = make_subplots(rows=1, cols=1, shared_xaxes=True, row_heights=[6.0], specs=[[{"type": "scatter"}]])
+
+            fig.add_trace(go.Scatter(x=dfsumgex.index, y=dfsumgex['GEX'], mode='lines+markers', name='spot levels'),
+                          row=1, col=1)
 
-        fig.add_trace(go.Scatter(x=dfsumgex.index, y=dfsumgex['GEX'], mode='lines+markers', name='spot levels'),
-                      row=1, col=1)
+            fig.add_trace(go.Scatter(x=[spotprice], y=[ngex0], mode='markers', name='spot price',
+                                     marker=dict(size=20, color='#66dc19')), row=1, col=1)
 
-        fig.add_trace(go.Scatter(x=[spotprice], y=[ngex0], mode='markers', name='spot price',
-                                 marker=dict(size=20, color='#66dc19')), row=1, col=1)
+            if zerogexlevel != None:
+                fig.add_trace(go.Scatter(x=[zerogexlevel], y=[0], mode='markers', name='0-gamma level',
+                                         marker=dict(size=20, color=' #ee195a')), row=1, col=1)
 
-        if zerogexlevel != None:
-            fig.add_trace(go.Scatter(x=[zerogexlevel], y=[0], mode='markers', name='0-gamma level',
-                                     marker=dict(size=20, color=' #ee195a')), row=1, col=1)
+            tdstr = info[1].strftime('%Y-%m-%d')
+            expiry = info[2].strftime('%Y-%m-%d')
+            fig.update_layout(title=f'Gamma levels of {info[0]} of expiry {expiry} on {tdstr}',
+                              title_x=0.5, width=1000, height=800)
+            fig.show()
 
-        tdstr = info[1].strftime('%Y-%m-%d')
-        expiry = info[2].strftime('%Y-%m-%d')
-        fig.update_layout(title=f'Gamma levels of {info[0]} of expiry {expiry} on {tdstr}',
-                          title_x=0.5, width=1000, height=800)
-        fig.show()
+    return dfsumgex, zerogexlevel
+
+def _scanchain(args):
+    """Scan worker: GEX table, zero gamma level and GEX profile on a common grid for one option chain."""
+    dfchain, info, commonlevels, ptfactor, rangefactor, gridfactor, oifield = args
+    dfgex = getgex(dfchain, info[-1], ptfactor, oifield=oifield)
+    gexinputs = _gexinputs(dfchain, info, oifield)
+    # Own grid (as `get0gamma`) and common grid in one gamma-matrix pass
+    spotlevels = info[-1] * np.exp(np.arange(-rangefactor, rangefactor, gridfactor))
+    cgex, pgex = _gexmatrix(np.concatenate([spotlevels, commonlevels]), *gexinputs, ptfactor)
+    numlevel = spotlevels.size
+    dfsumgex, zerogexlevel = _gexlevels(gexinputs, spotlevels, cgex[:numlevel], pgex[:numlevel], ptfactor)
+    return dfgex, dfsumgex, zerogexlevel, cgex[numlevel:], pgex[numlevel:]
+
+def scangex(chainlist, maxworkers=None, executor='process', ptfactor=100, rangefactor=0.125, gridfactor=0.0125,
+            oifield='oi'):
+    """
+    Obtain GEX tables and zero gamma levels of many `(dfchain, info)` pairs over a process or thread pool;
+    each chain is a DataFrame or an `OptionChain`.
+    Chains of the same underlying (`info[0]`) are also profiled on a common spot grid around the first chain's
+    spot price and summed into a cross-expiry GEX profile. Plotting is disabled.
+    Returns `scanlist` of (info, dfgex, dfsumgex, zerogexlevel) in input order and `aggdict` of
+    underlying: (dfsumgex, zerogexlevel).
+    """
+    assert executor in ['process', 'thread'], AttributeError('executor must be process or thread!')
+    chainlist = list(chainlist)
+    # Common spot grid per underlying
+    exprange = np.arange(-rangefactor, rangefactor, gridfactor)
+    gridict = {}
+    for dfchain, info in chainlist:
+        gridict.setdefault(info[0], info[-1] * np.exp(exprange))
+    arglist = [(dfchain, info, gridict[info[0]], ptfactor, rangefactor, gridfactor, oifield)
+               for dfchain, info in chainlist]
+    # Fan out over the pool (serially in-process for a single worker)
+    maxworkers = maxworkers or os.cpu_count() or 1
+    if maxworkers == 1 or len(arglist) <= 1:
+        resultlist = list(map(_scanchain, arglist))
+    else:
+        poolclass = ProcessPoolExecutor if executor == 'process' else ThreadPoolExecutor
+        with poolclass(max_workers=min(maxworkers, len(arglist))) as pool:
+            resultlist = list(pool.map(_scanchain, arglist))
+    scanlist = [(info, dfgex, dfsumgex, zerogexlevel)
+                for (_, info), (dfgex, dfsumgex, zerogexlevel, _, _) in zip(chainlist, resultlist)]
+    # Cross-expiry aggregation per underlying
+    aggdict = {}
+    for name, spotlevels in gridict.items():
+        members = [i for i, (_, info) in enumerate(chainlist) if info[0] == name]
+        cgex = sum(resultlist[i][3] for i in members)
+        pgex = sum(resultlist[i][4] for i in members)
+        dfsumgex = pd.DataFrame({'c_GEX': np.round(cgex, 2), 'p_GEX': np.round(pgex, 2),
+                                 'GEX': np.round(cgex + pgex, 2)}, index=spotlevels)
+        gexinputlist = [_gexinputs(chainlist[i][0], chainlist[i][1], oifield) for i in members]
+        gexfunc = lambda level, gexinputlist=gexinputlist: sum(sum(_gexmatrix(level, *gexinputs, ptfactor))[0]
+                                                               for gexinputs in gexinputlist)
+        aggdict[name] = (dfsumgex, getzerogamma(gexfunc, spotlevels, cgex + pgex))
+
+    return scanlist, aggdict
+
+
+class GexState():
+    """
+    Streaming GEX of an option chain: per-strike gamma & exposure with running call/put/net totals.
+    Spot moves reprice every strike in one vectorized pass; OI & IV ticks only touch the strikes they name.
+    """
+
+    def __init__(self, dfchain, info, ptfactor=100, oifield='oi'):
+        self.info = info  # (underlying, tradedate, expiry, ..., spot)
+        self.ptfactor = ptfactor  # Contract multiplier
+        self.strikes, self.civ, self.piv, self.coi, self.poi, self.tdays = _gexinputs(dfchain, info, oifield)
+        self.coi, self.poi = self.coi.copy(), self.poi.copy()  # Own OI arrays to update in place
+        self.strikeidx = {strike: i for i, strike in enumerate(self.strikes)}  # Strike to array position
+        self.zerogexlevel = None
+        self.updatespot(info[-1])
+
+    def _getidx(self, strike):
+        """Array positions of one or many strikes."""
+        return np.array([self.strikeidx[float(k)] for k in np.atleast_1d(strike)], dtype=int)
+
+    def updatespot(self, spotprice, refresh=False):
+        """Move underlying price: recompute gamma, exposure and totals of all strikes."""
+        self.spot = spotprice
+        self.scale = self.ptfactor * spotprice / 100
+        self.c_gamma = getGammaArray(spotprice, self.strikes, self.tdays, self.civ)
+        self.p_gamma = getGammaArray(spotprice, self.strikes, self.tdays, self.piv)
+        self.c_GEX = self.c_gamma * self.coi * self.scale
+        self.p_GEX = - self.p_gamma * self.poi * self.scale
+        self.cgexsum = self.c_GEX.sum()
+        self.pgexsum = self.p_GEX.sum()
+        if refresh:
+            self.refreshzero()
+
+    def updateoi(self, strike, oi, opType='C', refresh=False):
+        """Set OI of one or many strikes on the call or put side and adjust running totals."""
+        assert opType in ['C', 'P'], AttributeError('Must be call or put!')
+        idx = self._getidx(strike)
+        if opType == 'C':
+            self.coi[idx] = oi
+            newgex = self.c_gamma[idx] * self.coi[idx] * self.scale
+            self.cgexsum += newgex.sum() - self.c_GEX[idx].sum()
+            self.c_GEX[idx] = newgex
+        else:
+            self.poi[idx] = oi
+            newgex = - self.p_gamma[idx] * self.poi[idx] * self.scale
+            self.pgexsum += newgex.sum() - self.p_GEX[idx].sum()
+            self.p_GEX[idx] = newgex
+        if refresh:
+            self.refreshzero()
+
+    def updateiv(self, strike, iv, opType='C', refresh=False):
+        """Set IV (in %) of one or many strikes on the call or put side, regamma them and adjust running totals."""
+        assert opType in ['C', 'P'], AttributeError('Must be call or put!')
+        idx = self._getidx(strike)
+        if opType == 'C':
+            self.civ[idx] = np.asarray(iv, dtype=float) / 100
+            self.c_gamma[idx] = getGammaArray(self.spot, self.strikes[idx], self.tdays, self.civ[idx])
+            newgex = self.c_gamma[idx] * self.coi[idx] * self.scale
+            self.cgexsum += newgex.sum() - self.c_GEX[idx].sum()
+            self.c_GEX[idx] = newgex
+        else:
+            self.piv[idx] = np.asarray(iv, dtype=float) / 100
+            self.p_gamma[idx] = getGammaArray(self.spot, self.strikes[idx], self.tdays, self.piv[idx])
+            newgex = - self.p_gamma[idx] * self.poi[idx] * self.scale
+            self.pgexsum += newgex.sum() - self.p_GEX[idx].sum()
+            self.p_GEX[idx] = newgex
+        if refresh:
+            self.refreshzero()
+
+    def gettotalgex(self):
+        """Obtain call-GEX, put-GEX and total-GEX."""
+        return round(self.cgexsum, 2), round(self.pgexsum, 2), round(self.cgexsum + self.pgexsum, 2)
+
+    def getgexfunc(self):
+        """Net GEX of the current chain state as a function of underlying price."""
+        gexinputs = (self.strikes, self.civ, self.piv, self.coi, self.poi, self.tdays)
+        return lambda level: sum(_gexmatrix(level, *gexinputs, self.ptfactor))[0]
+
+    def refreshzero(self, localfactor=0.01, rangefactor=0.125, gridfactor=0.0125):
+        """
+        Update zero gamma level: a short grid of +/- `localfactor` around the last level is searched first,
+        falling back to the full grid of `get0gamma` around spot.
+        """
+        gexfunc = self.getgexfunc()
+        gexinputs = (self.strikes, self.civ, self.piv, self.coi, self.poi, self.tdays)
+        gridlist = [self.spot * np.exp(np.arange(-rangefactor, rangefactor, gridfactor))]
+        if self.zerogexlevel is not None:
+            gridlist.insert(0, self.zerogexlevel * np.exp(np.linspace(-localfactor, localfactor, 5)))
+        for spotlevels in gridlist:
+            cgex, pgex = _gexmatrix(spotlevels, *gexinputs, self.ptfactor)
+            self.zerogexlevel = getzerogamma(gexfunc, spotlevels, cgex + pgex)
+            if self.zerogexlevel is not None:
+                break
+        return self.zerogexlevel
 
-    return dfsumgex, zerogexlevel
\ No newline at end of file
+    def todataframe(self, decplace=4):
+        """Per-strike gamma and GEX of the current state, indexed by strike."""
+        dfgex = pd.DataFrame({'c_iv': self.civ * 100, 'p_iv': self.piv * 100, 'c_oi': self.coi, 'p_oi': self.poi,
+                              'c_gamma': self.c_gamma, 'p_gamma': self.p_gamma,
+                              'c_GEX': np.round(self.c_GEX, decplace), 'p_GEX': np.round(self.p_GEX, decplace)},
+                             index=pd.Index(self.strikes, name='strike'))
+        dfgex['GEX'] = np.round(dfgex['c_GEX'] + dfgex['p_GEX'], decplace)
+        return dfgex
@@ -0,0 +1,138 @@
+import os
+codepath_bsoption = os.path.dirname(os.path.abspath(__file__))
+import sys
+sys.path.append('..')
+
+import math
+
+import numpy as np
+
+# Numba is optional: without it the kernels stay plain Python and `bsmodel.setBackend` keeps the NumPy backend
+try:
+    import numba
+    from numba import prange
+    HAS_NUMBA = True
+except ImportError:
+    numba = None
+    prange = range
+    HAS_NUMBA = False
+
+_SQRT2 = math.sqrt(2)
+_INVSQRT2PI = 1 / math.sqrt(2 * math.pi)
+
+def _bsone(S, K, T, sig, rf, isCall):
+    """Price & greeks of one option in the units of `bsmodel.getBSArray`, z-scores computed once."""
+    t = T / 365
+    disc = K * math.exp(- rf * t)
+    sign = 1.0 if isCall else -1.0
+    if t <= 0 or sig <= 0:
+        # Expired or zero-IV option: intrinsic value, step delta
+        intrinsic = sign * (S - disc)
+        if intrinsic > 0:
+            return intrinsic, sign, 0.0, 0.0, 0.0
+        return 0.0, 0.0, 0.0, 0.0, 0.0
+    sqt = math.sqrt(t)
+    sigt = sig * sqt
+    d1 = (math.log(S / K) + t * (rf + 0.5 * sig * sig)) / sigt
+    d2 = d1 - sigt
+    pdf1 = _INVSQRT2PI * math.exp(-0.5 * d1 * d1)
+    cdf1 = 0.5 * math.erfc(- sign * d1 / _SQRT2)
+    cdf2 = 0.5 * math.erfc(- sign * d2 / _SQRT2)
+    price = sign * (S * cdf1 - disc * cdf2)
+    theta = (- S * pdf1 * sig / (2 * sqt) + rf * disc * cdf2) / 365
+    return price, sign * cdf1, theta, S * pdf1 * sqt / 100, pdf1 / (S * sigt)
+
+def _gammaone(S, K, T, sig, rf):
+    """Gamma of one option (same for call & put); zero when expired or zero-IV."""
+    t = T / 365
+    if t <= 0 or sig <= 0:
+        return 0.0
+    sigt = sig * math.sqrt(t)
+    d1 = (math.log(S / K) + t * (rf + 0.5 * sig * sig)) / sigt
+    return _INVSQRT2PI * math.exp(-0.5 * d1 * d1) / (S * sigt)
+
+def _ivone(S, K, T, P, rf, isCall, minsig, maxsig, maxStep, tol):
+    """IV (in %) of one option by Newton steps inside a bisection bracket; returns (iv, nstep, resid)."""
+    t = T / 365
+    disc = K * math.exp(- rf * t)
+    lowb = max(S - disc if isCall else disc - S, 0.0)
+    upb = S if isCall else disc
+    if not (P >= lowb - tol and P < upb):  # Outside no-arbitrage bounds (or NaN)
+        return math.nan, 0, math.nan
+    if T <= 0 or P <= lowb + tol:
+        return minsig * 100, 0, P - lowb
+    if _bsone(S, K, T, maxsig, rf, isCall)[0] < P:  # Beyond the IV bracket
+        return math.nan, 0, math.nan
+    lo = minsig
+    hi = maxsig
+    # Initial guess (Manaster-Koehler), falling back to Brenner-Subrahmanyam when at the money
+    sig = math.sqrt(2 * abs(math.log(S / disc)) / t)
+    if sig <= 0:
+        sig = math.sqrt(2 * math.pi / t) * P / S
+    sig = min(max(sig, lo + 0.01 * (hi - lo)), hi - 0.01 * (hi - lo))
+    for step in range(1, maxStep + 1):
+        price, _, _, vega, _ = _bsone(S, K, T, sig, rf, isCall)
+        diff = price - P
+        if abs(diff) <= tol:
+            return sig * 100, step, diff
+        if diff > 0:
+            hi = sig
+        else:
+            lo = sig
+        newsig = sig - diff / (vega * 100) if vega > 0 else math.nan
+        sig = newsig if lo < newsig < hi else (lo + hi) / 2
+    return sig * 100, maxStep, _bsone(S, K, T, sig, rf, isCall)[0] - P
+
+def _bsloop(S, K, T, sig, rf, isCall, price, delta, theta, vega, gamma):
+    """Fill price & greek arrays element by element."""
+    for i in prange(S.size):
+        price[i], delta[i], theta[i], vega[i], gamma[i] = _bsone(S[i], K[i], T[i], sig[i], rf[i], isCall[i])
+
+def _gammaloop(S, K, T, sig, rf, gamma):
+    """Fill a gamma array element by element."""
+    for i in prange(S.size):
+        gamma[i] = _gammaone(S[i], K[i], T[i], sig[i], rf[i])
+
+def _ivloop(S, K, T, P, rf, isCall, minsig, maxsig, maxStep, tol, iv, nstep, resid):
+    """Fill IV, iteration & residual arrays element by element, each with its own early exit."""
+    for i in prange(S.size):
+        iv[i], nstep[i], resid[i] = _ivone(S[i], K[i], T[i], P[i], rf[i], isCall[i], minsig, maxsig, maxStep, tol)
+
+if HAS_NUMBA:
+    _bsone = numba.njit(cache=True, error_model='numpy')(_bsone)
+    _gammaone = numba.njit(cache=True, error_model='numpy')(_gammaone)
+    _ivone = numba.njit(cache=True, error_model='numpy')(_ivone)
+    _bsloop = numba.njit(parallel=True, cache=True, error_model='numpy')(_bsloop)
+    _gammaloop = numba.njit(parallel=True, cache=True, error_model='numpy')(_gammaloop)
+    _ivloop = numba.njit(parallel=True, cache=True, error_model='numpy')(_ivloop)
+
+def _flatten(*arrays):
+    """Broadcast inputs to read-only 1-d contiguous arrays; the last one is the call/put mask."""
+    arrays = np.broadcast_arrays(*[np.asarray(x, dtype=float) for x in arrays[:-1]], np.asarray(arrays[-1], dtype=bool))
+    flatlist = [np.ascontiguousarray(x).ravel() for x in arrays]
+    for x in flatlist:
+        x.flags.writeable = False  # Kernels only read inputs; also avoids writing through broadcast views
+    return arrays[0].shape, flatlist
+
+def bsarray(S, K, T, sig, rf=0, isCall=True):
+    """Fused-kernel counterpart of `bsmodel.getBSArray`."""
+    shape, (S, K, T, sig, rf, isCall) = _flatten(S, K, T, sig, rf, isCall)
+    outs = [np.empty(S.size) for _ in range(5)]
+    _bsloop(S, K, T, sig, rf, isCall, *outs)
+    return tuple(out.reshape(shape) for out in outs)
+
+def gammaarray(S, K, T, sig, rf=0):
+    """Fused-kernel counterpart of `bsmodel.getGammaArray`."""
+    shape, (S, K, T, sig, rf, _) = _flatten(S, K, T, sig, rf, True)
+    gamma = np.empty(S.size)
+    _gammaloop(S, K, T, sig, rf, gamma)
+    return gamma.reshape(shape)
+
+def ivarray(S, K, T, P, isCall=True, rf=0, minIV=0, maxIV=400.0, maxStep=50, tol=1e-8):
+    """Fused-kernel counterpart of `bsmodel.getIVArray`."""
+    shape, (S, K, T, P, rf, isCall) = _flatten(S, K, T, P, rf, isCall)
+    iv = np.empty(S.size)
+    nstep = np.empty(S.size, dtype=np.int64)
+    resid = np.empty(S.size)
+    _ivloop(S, K, T, P, rf, isCall, minIV / 100, maxIV / 100, maxStep, tol, iv, nstep, resid)
+    return iv.reshape(shape), nstep.reshape(shape), resid.reshape(shape)
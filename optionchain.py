@@ -0,0 +1,118 @@
+import os
+codepath_bsoption = os.path.dirname(os.path.abspath(__file__))
+import sys
+sys.path.append('..')
+
+import datetime
+import json
+
+import numpy as np
+
+from bsoption.bsmodel import getGammaArray
+
+fieldlist = ['strike', 'c_iv', 'p_iv', 'c_gamma', 'p_gamma', 'c_oi', 'p_oi']  # Stored chain fields
+
+class OptionChain():
+    """
+    Array-backed option chain: one array per field (struct of arrays) over ascending strikes, IV in %.
+    `info` follows the GEX functions: (underlying, tradedate, expiry, ..., spot).
+    Strike ranges and call/put sides are views sharing memory with the parent chain.
+    Strikes are always float64 (they key strike lookups); `dtype` applies to IV, gamma & OI.
+    """
+
+    def __init__(self, info, strike, c_iv, p_iv, c_oi, p_oi, c_gamma=None, p_gamma=None, dtype=np.float64):
+        self.info = info  # (underlying, tradedate, expiry, ..., spot)
+        self.strike = np.asarray(strike, dtype=np.float64)  # Strike prices (ascending)
+        self.c_iv = np.asarray(c_iv, dtype=dtype)  # Call IV (in %)
+        self.p_iv = np.asarray(p_iv, dtype=dtype)  # Put IV (in %)
+        self.c_oi = np.asarray(c_oi, dtype=dtype)  # Call open interest
+        self.p_oi = np.asarray(p_oi, dtype=dtype)  # Put open interest
+        # Gamma at the snapshot spot, computed if not given
+        tdays = (info[2] - info[1]).days
+        if c_gamma is None:
+            c_gamma = getGammaArray(info[-1], self.strike, tdays, self.c_iv / 100)
+        if p_gamma is None:
+            p_gamma = getGammaArray(info[-1], self.strike, tdays, self.p_iv / 100)
+        self.c_gamma = np.asarray(c_gamma, dtype=dtype)
+        self.p_gamma = np.asarray(p_gamma, dtype=dtype)
+
+    def __len__(self):
+        return len(self.strike)
+
+    @classmethod
+    def fromframe(cls, dfchain, info, oifield='oi', dtype=np.float64):
+        """Build from a strike-indexed chain DataFrame with `c_`/`p_` columns (`c_{oifield}` as OI)."""
+        dfchain = dfchain.sort_index()
+        gamma = lambda side: dfchain[f'{side}_gamma'].to_numpy() if f'{side}_gamma' in dfchain.columns else None
+        return cls(info, dfchain.index.to_numpy(), dfchain['c_iv'].to_numpy(), dfchain['p_iv'].to_numpy(),
+                   dfchain[f'c_{oifield}'].to_numpy(), dfchain[f'p_{oifield}'].to_numpy(), gamma('c'), gamma('p'), dtype)
+
+    def toframe(self):
+        """Strike-indexed DataFrame copy in the layout of the GEX functions."""
+        import pandas as pd
+        dfchain = pd.DataFrame({field: getattr(self, field) for field in fieldlist[1:]},
+                               index=pd.Index(self.strike, name='strike'))
+        return dfchain
+
+    def view(self, lowstrike=None, upstrike=None):
+        """Chain of strikes within [lowstrike, upstrike], sharing memory with this chain."""
+        start = 0 if lowstrike is None else np.searchsorted(self.strike, lowstrike, side='left')
+        stop = len(self) if upstrike is None else np.searchsorted(self.strike, upstrike, side='right')
+        return OptionChain(self.info, *[getattr(self, field)[start:stop] for field in
+                                        ['strike', 'c_iv', 'p_iv', 'c_oi', 'p_oi', 'c_gamma', 'p_gamma']],
+                           dtype=self.c_iv.dtype)
+
+    def side(self, opType):
+        """Call or put side as a dict of `strike`, `iv`, `gamma` and `oi` views."""
+        assert opType in ['C', 'P'], AttributeError('Must be call or put!')
+        prefix = opType.lower()
+        return {'strike': self.strike, 'iv': getattr(self, f'{prefix}_iv'), 'gamma': getattr(self, f'{prefix}_gamma'),
+                'oi': getattr(self, f'{prefix}_oi')}
+
+def _encodeinfo(info):
+    """JSON-safe `info`, tagging dates & timestamps."""
+    tag = lambda x: ({'datetime': x.isoformat()} if isinstance(x, datetime.datetime) else
+                     {'date': x.isoformat()} if isinstance(x, datetime.date) else
+                     x.item() if isinstance(x, np.generic) else x)
+    return [tag(x) for x in info]
+
+def _decodeinfo(infolist):
+    """Inverse of `_encodeinfo`."""
+    untag = lambda x: (datetime.datetime.fromisoformat(x['datetime']) if isinstance(x, dict) and 'datetime' in x else
+                       datetime.date.fromisoformat(x['date']) if isinstance(x, dict) and 'date' in x else x)
+    return tuple(untag(x) for x in infolist)
+
+def savechains(chainlist, path, dtype=None):
+    """
+    Save many chain snapshots to directory `path`: one `{field}.npy` per field holding all snapshots back to back,
+    `offsets.npy` of snapshot boundaries and `info.json`. Snapshots are written one at a time into the files.
+    IV, gamma & OI are stored as `dtype` (default: that of the first chain, e.g. np.float32 to halve the files);
+    strikes always as float64.
+    """
+    dtype = chainlist[0].c_iv.dtype if dtype is None else dtype
+    os.makedirs(path, exist_ok=True)
+    offsets = np.cumsum([0] + [len(chain) for chain in chainlist])
+    for field in fieldlist:
+        fieldmap = np.lib.format.open_memmap(os.path.join(path, f'{field}.npy'), mode='w+',
+                                             dtype=np.float64 if field == 'strike' else dtype,
+                                             shape=(int(offsets[-1]),))
+        for chain, start, stop in zip(chainlist, offsets[:-1], offsets[1:]):
+            fieldmap[start:stop] = getattr(chain, field)
+        fieldmap.flush()
+        del fieldmap
+    np.save(os.path.join(path, 'offsets.npy'), offsets)
+    with open(os.path.join(path, 'info.json'), 'w') as file:
+        json.dump([_encodeinfo(chain.info) for chain in chainlist], file)
+
+def loadchains(path, mmap=True):
+    """Load chain snapshots saved by `savechains`; with `mmap` every chain is a view into memory-mapped files."""
+    fielddict = {field: np.load(os.path.join(path, f'{field}.npy'), mmap_mode='r' if mmap else None)
+                 for field in fieldlist}
+    offsets = np.load(os.path.join(path, 'offsets.npy'))
+    with open(os.path.join(path, 'info.json')) as file:
+        infolist = json.load(file)
+    dtype = fielddict['c_iv'].dtype
+    return [OptionChain(_decodeinfo(info), *[fielddict[field][start:stop] for field in
+                                             ['strike', 'c_iv', 'p_iv', 'c_oi', 'p_oi', 'c_gamma', 'p_gamma']],
+                        dtype=dtype)
+            for info, start, stop in zip(infolist, offsets[:-1], offsets[1:])]
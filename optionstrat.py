@@ -3,7 +3,11 @@ codepath_bsoption = os.path.dirname(os.path.abspath(__file__))
 import sys
 sys.path.append('..')
 
+import numpy as np
+import pandas as pd
+
 from bsoption import *
+from bsoption import profiler
 from bsoption.bsmodel import *
 
 stratdict = {
@@ -48,30 +52,35 @@ class Opduo():
         BS2 = BSModel(spot, self.str2, day2, self.sig2)  # BSModel of option 2
         return BS1, BS2
 
+    @profiler.timed('strategy', 1)
     def getstratspec(self, spot, tradedate, opside="LONG", digit=2):
         """Obtain strategy price & greeks."""
         # Assert combo side
         assert opside in ['LONG', 'SHORT'], AttributeError('opside must be LONG or SHORT!')
         # Pair of BSModel objects
         BS1, BS2 = self.getduomodel(spot, tradedate)
-        opprice1 = BS1.getopprice(self.op1)
-        opprice2 = BS2.getopprice(self.op2)
+        opprice1 = BS1.getOpPrice(self.op1)
+        opprice2 = BS2.getOpPrice(self.op2)
         sign = lambda x: 1 if x == 'LONG' else -1
         # Strategy price
         stratprice = round((opprice1 * self.ratio1 + opprice2 * self.ratio2) * sign(opside), digit)
         # Strategy delta
-        delta = round((BS1.getdelta(self.op1) * self.ratio1 + BS2.getdelta(self.op2) * self.ratio2) * sign(opside), 4)
+        delta = round((BS1.getDelta(self.op1) * self.ratio1 + BS2.getDelta(self.op2) * self.ratio2) * sign(opside), 4)
         # strategy theta
-        theta = round((BS1.gettheta(self.op1) * self.ratio1 + BS2.gettheta(self.op2) * self.ratio2) * sign(opside), 4)
+        theta = round((BS1.getTheta(self.op1) * self.ratio1 + BS2.getTheta(self.op2) * self.ratio2) * sign(opside), 4)
         # strategy vega
-        vega = round((BS1.vega * self.ratio1 + BS2.vega * self.ratio2) * sign(opside), 4)
+        vega = round((BS1.Vega * self.ratio1 + BS2.Vega * self.ratio2) * sign(opside), 4)
         #  strategy gamma
-        gamma = round((BS1.gamma * self.ratio1 + BS2.gamma * self.ratio2) * sign(opside), 4)
+        gamma = round((BS1.Gamma * self.ratio1 + BS2.Gamma * self.ratio2) * sign(opside), 4)
 
         return stratprice, delta, theta, vega, gamma
 
-    def getpayoff(self, preexpiry=False, numday=(7, 21, 63), opside='LONG'):
-        """Obtain payoff diagram at expiry and (if `preexpiry` enabled) payoff of each given days before expiry."""
+    def getpayofftable(self, preexpiry=False, numday=(7, 21, 63), opside='LONG', numpoint=200, surface=None,
+                       mode='sticky-strike'):
+        """
+        Obtain payoff table at expiry and (if `preexpiry` enabled) of each given days before expiry; no plot.
+        Pre-expiry curves read IVs from `surface` (a `VolSurface`) under `mode` if given.
+        """
         # Assert combo side
         assert opside in ['LONG', 'SHORT'], AttributeError('opside must be LONG or SHORT!')
         # price axis bounds and scales
@@ -80,43 +89,143 @@ class Opduo():
         sig = max([self.sig1, self.sig2])
         lowb = minK * (1 - sig / 2)
         upb = maxK * (1 + sig / 2)
-        pricearr = np.linspace(lowb, upb, 200)
+        pricearr = np.linspace(lowb, upb, numpoint)
+        sign = 1 if opside == 'LONG' else -1
         # Payoff dataframe
-        dfprice = pd.DataFrame(columns=['spot', 'exp1', 'exp2', 'exp'])
-        dfprice['spot'] = pricearr
-        halfplus = lambda x: x if x > 0 else 0
-        for num in [1, 2]:
-            if self.__dict__[f'op{num}'] == 'C':
-                dfprice[f'exp{num}'] = (dfprice['spot'] - self.__dict__[f'str{num}']).apply(halfplus)
-            else:
-                dfprice[f'exp{num}'] = (self.__dict__[f'str{num}'] - dfprice['spot']).apply(halfplus)
-        dfprice['exp'] = dfprice['exp1'] * self.ratio1 + dfprice['exp2'] * self.ratio2
-        if opside == 'SHORT':
-            dfprice['exp'] *= -1
-        # Payoff subplot
-        fig = make_subplots(rows=1, cols=1, shared_xaxes=True, vertical_spacing=0.05, row_heights=[0.5],
-                            specs=[[{"type": "scatter"}]])
-
-        fig.add_trace(
-            go.Scatter(x=dfprice['spot'], y=dfprice['exp'], mode="lines", name="At Expiry", line_color='#43b117'),
-            row=1, col=1)
-        # Pre-expiry payoff curve
+        dfprice = pd.DataFrame({'spot': pricearr})
+        dfprice['exp1'] = np.maximum((pricearr - self.str1) * (1 if self.op1 == 'C' else -1), 0)
+        dfprice['exp2'] = np.maximum((pricearr - self.str2) * (1 if self.op2 == 'C' else -1), 0)
+        dfprice['exp'] = (dfprice['exp1'] * self.ratio1 + dfprice['exp2'] * self.ratio2) * sign
+        # Pre-expiry payoff curves: (spot x horizon) price grid per leg
         if preexpiry:
-            for day in numday:
-                for num in [1, 2]:
-                    if self.__dict__[f'op{num}'] == 'C':
-                        bsfunc = lambda x: BSModel(x, self.__dict__[f'str{num}'], day,
-                                                   self.__dict__[f'sig{num}']).cprice
-                    else:
-                        bsfunc = lambda x: BSModel(x, self.__dict__[f'str{num}'], day,
-                                                   self.__dict__[f'sig{num}']).pprice
-                    dfprice[f'temp{num}'] = round(dfprice['spot'].apply(bsfunc), 2)
-                dfprice[f'{day}day'] = dfprice['temp1'] * self.ratio1 + dfprice['temp2'] * self.ratio2
-                if opside == 'SHORT':
-                    dfprice[f'{day}day'] *= -1
-                fig.add_trace(go.Scatter(x=dfprice['spot'], y=dfprice[f'{day}day'],
-                                         mode="markers", name=f"{day}D", line_color='#d516cc'), row=1, col=1)
-        # Chart title
-        fig.update_layout(height=800, showlegend=False, title_x=0.5,
-                          title_text=f'{opside}-{self.strat}-{self.str1}{self.op1}-{self.str2}{self.op2}')
-        fig.show()
\ No newline at end of file
+            dayarr = np.asarray(numday, dtype=float)
+            sig1, sig2 = self.sig1, self.sig2
+            if surface is not None:
+                sig1 = surface.getiv(pricearr[:, None], self.str1, dayarr, mode) / 100
+                sig2 = surface.getiv(pricearr[:, None], self.str2, dayarr, mode) / 100
+            price1 = np.round(getBSArray(pricearr[:, None], self.str1, dayarr, sig1, 0, self.op1 == 'C')[0], 2)
+            price2 = np.round(getBSArray(pricearr[:, None], self.str2, dayarr, sig2, 0, self.op2 == 'C')[0], 2)
+            stratprice = (price1 * self.ratio1 + price2 * self.ratio2) * sign
+            for i, day in enumerate(numday):
+                dfprice[f'{day}day'] = stratprice[:, i]
+
+        return dfprice
+
+    def getpayoff(self, preexpiry=False, numday=(7, 21, 63), opside='LONG'):
+        """Obtain payoff diagram at expiry and (if `preexpiry` enabled) payoff of each given days before expiry."""
+        dfprice = self.getpayofftable(preexpiry, numday, opside)
+        plotpayoff(dfprice, f'{opside}-{self.strat}-{self.str1}{self.op1}-{self.str2}{self.op2}')
+        return dfprice
+
+
+@profiler.timed('plotting')
+def plotpayoff(dfprice, title):
+    """Plot strategy payoff curves of a payoff table: `exp` at expiry and each `{day}day` column."""
+    import plotly.graph_objects as go
+    from plotly.subplots import make_subplots
+    fig = make_subplots(rows=1, cols=1, shared_xaxes=True, vertical_spacing=0.05, row_heights=[0.5],
+                        specs=[[{"type": "scatter"}]])
+
+    fig.add_trace(
+        go.Scatter(x=dfprice['spot'], y=dfprice['exp'], mode="lines", name="At Expiry", line_color='#43b117'),
+        row=1, col=1)
+    # Pre-expiry payoff curve
+    for col in dfprice.columns:
+        if col.endswith('day'):
+            fig.add_trace(go.Scatter(x=dfprice['spot'], y=dfprice[col],
+                                     mode="markers", name=f"{col[:-3]}D", line_color='#d516cc'), row=1, col=1)
+    # Chart title
+    fig.update_layout(height=800, showlegend=False, title_x=0.5, title_text=title)
+    fig.show()
+
+
+class Opcombo():
+    """
+    Formulate option strategy involving any number of option legs, stored as arrays.
+    Quantities are signed (+ long, - short); IVs are decimal as in `BSModel`.
+    """
+
+    def __init__(self, optypes, strikes, expiries, sigs, qtys, strat='combo', rf=0):
+        self.optypes = np.asarray(optypes)  # Option types of legs (call or put)
+        assert np.isin(self.optypes, ['C', 'P']).all(), AttributeError('Must be call or put!')
+        self.iscall = self.optypes == 'C'
+        self.strikes = np.asarray(strikes, dtype=float)  # Strike prices
+        self.expiries = np.asarray(expiries, dtype='datetime64[D]')  # Expiry dates
+        self.sigs = np.asarray(sigs, dtype=float)  # IVs
+        self.qtys = np.asarray(qtys, dtype=float)  # Signed quantities
+        self.strat = strat  # strategy name
+        self.rf = rf  # risk-free rate
+
+    @classmethod
+    def fromduo(cls, duo):
+        """Convert an `Opduo` into an equivalent two-leg combo."""
+        return cls([duo.op1, duo.op2], [duo.str1, duo.str2], [duo.exp1, duo.exp2], [duo.sig1, duo.sig2],
+                   [duo.ratio1, duo.ratio2], duo.strat, duo.rf)
+
+    @classmethod
+    def ironcondor(cls, putlow, putup, calllow, callup, expiry, sig, qty=1, rf=0):
+        """Short iron condor: sell the inner put & call, buy the outer wings (`sig` scalar or one per leg)."""
+        return cls(['P', 'P', 'C', 'C'], [putlow, putup, calllow, callup], [expiry] * 4,
+                   np.broadcast_to(sig, 4), np.array([1, -1, -1, 1]) * qty, 'ironcondor', rf)
+
+    @classmethod
+    def butterfly(cls, optype, lowstrike, midstrike, upstrike, expiry, sig, qty=1, rf=0):
+        """Long butterfly: buy the wings, sell twice the body (`sig` scalar or one per leg)."""
+        return cls([optype] * 3, [lowstrike, midstrike, upstrike], [expiry] * 3,
+                   np.broadcast_to(sig, 3), np.array([1, -2, 1]) * qty, 'butterfly', rf)
+
+    @classmethod
+    def calendar(cls, optype, strike, nearexpiry, farexpiry, sig, qty=1, rf=0):
+        """Long calendar: sell the near expiry, buy the far expiry (`sig` scalar or one per leg)."""
+        return cls([optype] * 2, [strike] * 2, [nearexpiry, farexpiry],
+                   np.broadcast_to(sig, 2), np.array([-1, 1]) * qty, 'calendar', rf)
+
+    @profiler.timed('strategy', lambda result: result[0].size)
+    def getstratarray(self, spot, tradedate, opside='LONG', surface=None, mode='sticky-strike'):
+        """
+        Obtain unrounded strategy price & greeks over broadcastable arrays of spots and trade dates in one pass,
+        e.g. `spot[:, None]` against `tradedate[None, :]` for a grid. Returns (price, delta, theta, vega, gamma).
+        Leg IVs are read from `surface` (a `VolSurface`) under `mode` if given, else the fixed `sigs`.
+        """
+        assert opside in ['LONG', 'SHORT'], AttributeError('opside must be LONG or SHORT!')
+        spot, tradedate = np.broadcast_arrays(np.asarray(spot, dtype=float), np.asarray(tradedate, dtype='datetime64[D]'))
+        # Days to expiry of each leg, along a trailing leg axis
+        days = (self.expiries - tradedate[..., None]).astype(float)
+        sigs = self.sigs if surface is None else surface.getiv(spot[..., None], self.strikes, days, mode) / 100
+        legvalues = getBSArray(spot[..., None], self.strikes, days, sigs, self.rf, self.iscall)
+        weight = self.qtys * (1 if opside == 'LONG' else -1)
+        return tuple(values @ weight for values in legvalues)
+
+    def getstratspec(self, spot, tradedate, opside='LONG', digit=2, surface=None, mode='sticky-strike'):
+        """Obtain strategy price & greeks, rounded as `Opduo.getstratspec`."""
+        stratprice, delta, theta, vega, gamma = self.getstratarray(spot, tradedate, opside, surface, mode)
+        return (round(float(stratprice), digit), round(float(delta), 4), round(float(theta), 4),
+                round(float(vega), 4), round(float(gamma), 4))
+
+    def getpayofftable(self, preexpiry=False, numday=(7, 21, 63), opside='LONG', spots=None, numpoint=200,
+                       surface=None, mode='sticky-strike'):
+        """
+        Obtain payoff table at (first) expiry and (if `preexpiry` enabled) of each given days before it; no plot.
+        Legs expiring later keep their remaining days of time value in every curve; IVs from `surface` if given.
+        """
+        assert opside in ['LONG', 'SHORT'], AttributeError('opside must be LONG or SHORT!')
+        if spots is None:
+            sig = self.sigs.max()
+            spots = np.linspace(self.strikes.min() * (1 - sig / 2), self.strikes.max() * (1 + sig / 2), numpoint)
+        spots = np.asarray(spots, dtype=float)
+        # Horizons as trade dates counted back from the first expiry, evaluated as one (spot x horizon) grid
+        horizons = np.array([0] + list(numday if preexpiry else []), dtype='timedelta64[D]')
+        tradedates = self.expiries.min() - horizons
+        stratprice = self.getstratarray(spots[:, None], tradedates[None, :], opside, surface, mode)[0]
+        dfprice = pd.DataFrame({'spot': spots, 'exp': stratprice[:, 0]})
+        for i, day in enumerate(numday if preexpiry else []):
+            dfprice[f'{day}day'] = np.round(stratprice[:, i + 1], 2)
+
+        return dfprice
+
+    def getpayoff(self, preexpiry=False, numday=(7, 21, 63), opside='LONG'):
+        """Obtain payoff diagram at expiry and (if `preexpiry` enabled) payoff of each given days before expiry."""
+        dfprice = self.getpayofftable(preexpiry, numday, opside)
+        plotpayoff(dfprice, f'{opside}-{self.strat}-' + '-'.join(f'{q:g}x{k:g}{op}' for q, k, op in
+                                                                 zip(self.qtys, self.strikes, self.optypes)))
+        return dfprice
@@ -0,0 +1,85 @@
+import os
+codepath_bsoption = os.path.dirname(os.path.abspath(__file__))
+import sys
+sys.path.append('..')
+
+import numpy as np
+import pandas as pd
+
+from bsoption.bsmodel import getBSArray, getIVArray
+
+def iterchunks(source, chunksize=100000, timefield=None):
+    """Iterate a DataFrame, CSV or Parquet file of option bars in chunks of at most `chunksize` rows."""
+    if isinstance(source, pd.DataFrame):
+        for start in range(0, len(source), chunksize):
+            yield source.iloc[start:start + chunksize]
+    elif str(source).endswith('.parquet'):
+        import pyarrow.parquet as pq
+        for batch in pq.ParquetFile(source).iter_batches(batch_size=chunksize):
+            dfchunk = batch.to_pandas()
+            yield dfchunk.set_index(timefield) if timefield in dfchunk.columns else dfchunk
+    else:
+        yield from pd.read_csv(source, chunksize=chunksize, index_col=timefield, parse_dates=timefield is not None)
+
+def _getfield(dfchunk, value):
+    """Column of a chunk if `value` names one, otherwise the constant `value` itself."""
+    return dfchunk[value].to_numpy() if isinstance(value, str) and value in dfchunk.columns else value
+
+def enrichchunk(dfchunk, strike, expiry, opType, priceField='price', spotField='ftClose', timefield=None, rf=0):
+    """
+    Add IV (`sig`, in %) and `delta`, `theta`, `vega`, `gamma` columns to a chunk of option bars, as expected by
+    `getOptionTimecurve`. `strike`, `expiry` and `opType` are constants or column names; bar time is the index
+    unless `timefield` names a column, and must be datetime-like (file sources need `timefield`).
+    Days to expiry are fractional, so intraday decay is kept.
+    """
+    dfchunk = dfchunk.copy()
+    bartime = dfchunk[timefield] if timefield in dfchunk.columns else dfchunk.index
+    # Integer/float bar times (e.g. the RangeIndex of a CSV read without `timefield`) would pass as epoch timestamps
+    assert not pd.api.types.is_numeric_dtype(bartime), \
+        AttributeError('Bar time must be a datetime index or named by `timefield`!')
+    bartime = pd.DatetimeIndex(pd.to_datetime(bartime))
+    expiry = _getfield(dfchunk, expiry)
+    tdays = np.maximum((pd.DatetimeIndex(np.broadcast_to(expiry, len(dfchunk))) - bartime) / pd.Timedelta(days=1), 0)
+    strike = _getfield(dfchunk, strike)
+    isCall = np.asarray(_getfield(dfchunk, opType)) == 'C'
+    spot = dfchunk[spotField].to_numpy(dtype=float)
+    sig = getIVArray(spot, strike, tdays, dfchunk[priceField].to_numpy(dtype=float), isCall, rf)[0]
+    _, delta, theta, vega, gamma = getBSArray(spot, strike, tdays, sig / 100, rf, isCall)
+    dfchunk['sig'] = sig
+    dfchunk['delta'] = delta
+    dfchunk['theta'] = theta
+    dfchunk['vega'] = vega
+    dfchunk['gamma'] = gamma
+
+    return dfchunk
+
+def enrichbars(source, strike, expiry, opType, dest=None, priceField='price', spotField='ftClose', timefield=None,
+               rf=0, chunksize=100000):
+    """
+    Stream option bars from a DataFrame, CSV or Parquet `source`, solve IV & greeks per chunk and write the enriched
+    chunks to `dest` (.csv or .parquet) as they are produced, holding one chunk in memory at a time.
+    Returns the number of rows written, or the enriched DataFrame when `dest` is None.
+    """
+    chunkgen = (enrichchunk(dfchunk, strike, expiry, opType, priceField, spotField, timefield, rf)
+                for dfchunk in iterchunks(source, chunksize, timefield))
+    if dest is None:
+        return pd.concat(list(chunkgen))
+
+    numrow = 0
+    writer = None
+    try:
+        for dfchunk in chunkgen:
+            if str(dest).endswith('.parquet'):
+                import pyarrow as pa
+                import pyarrow.parquet as pq
+                table = pa.Table.from_pandas(dfchunk, schema=writer.schema if writer else None)
+                writer = writer or pq.ParquetWriter(dest, table.schema)
+                writer.write_table(table)
+            else:
+                dfchunk.to_csv(dest, mode='a' if numrow else 'w', header=not numrow)
+            numrow += len(dfchunk)
+    finally:
+        if writer is not None:
+            writer.close()
+
+    return numrow
@@ -0,0 +1,122 @@
+import os
+codepath_bsoption = os.path.dirname(os.path.abspath(__file__))
+import sys
+sys.path.append('..')
+
+import functools
+import json
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+
+_ACTIVE = None  # Profiler recording within `profiling`
+_NULLSTAGE = nullcontext()  # Shared no-op stage while profiling is off
+
+class Profiler():
+    """
+    Registry of call counts, cumulative wall time and element counts per stage
+    (pricing, iv, strategy, gex, zerogamma, scenario, plotting), plus event counters such as IV steps &
+    non-convergences. Stages are exclusive: work nested in an active stage (e.g. the repricing inside an IV solve
+    or zero gamma search) is charged to the outermost stage only, so stage times add up to wall time.
+    """
+
+    def __init__(self):
+        self.stages = {}  # stage: {'calls', 'seconds', 'elements'}
+        self.counters = {}  # event: count
+        self._local = threading.local()  # Per-thread depth of active stages
+        self._lock = threading.Lock()  # Guards stages & counters against concurrent updates
+
+    def _enter(self):
+        """Open a stage level; True if it is the outermost one of this thread."""
+        depth = getattr(self._local, 'depth', 0)
+        self._local.depth = depth + 1
+        return depth == 0
+
+    def _exit(self):
+        """Close a stage level."""
+        self._local.depth -= 1
+
+    @contextmanager
+    def stage(self, name, elements=0):
+        """Time a block of work under stage `name` covering `elements` options / grid points, unless nested."""
+        outermost = self._enter()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._exit()
+            if outermost:
+                self.record(name, time.perf_counter() - start, elements)
+
+    def record(self, name, seconds, elements=0):
+        """Add one call of `seconds` wall time over `elements` to stage `name`."""
+        with self._lock:
+            record = self.stages.setdefault(name, {'calls': 0, 'seconds': 0.0, 'elements': 0})
+            record['calls'] += 1
+            record['seconds'] += seconds
+            record['elements'] += int(elements)
+
+    def count(self, name, num=1):
+        """Add `num` to event counter `name`."""
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + int(num)
+
+    def todict(self):
+        """Stages & counters as a plain dict."""
+        with self._lock:
+            return {'stages': {name: dict(record) for name, record in self.stages.items()},
+                    'counters': dict(self.counters)}
+
+    def tojson(self, **kwargs):
+        """Stages & counters as a JSON string."""
+        return json.dumps(self.todict(), **kwargs)
+
+    def reset(self):
+        """Clear all stages & counters."""
+        with self._lock:
+            self.stages.clear()
+            self.counters.clear()
+
+def stage(name, elements=0):
+    """Stage context of the active profiler; a shared no-op context when profiling is off."""
+    return _NULLSTAGE if _ACTIVE is None else _ACTIVE.stage(name, elements)
+
+def count(name, num=1):
+    """Add to an event counter of the active profiler, if any."""
+    if _ACTIVE is not None:
+        _ACTIVE.count(name, num)
+
+def timed(name, elements=0):
+    """
+    Decorator recording each call under stage `name` while profiling is on; `elements` is a count or a function
+    of the call's return value. When profiling is off the call passes straight through; calls nested in an
+    active stage are charged to that stage.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            profiler = _ACTIVE
+            if profiler is None:
+                return func(*args, **kwargs)
+            outermost = profiler._enter()
+            start = time.perf_counter()
+            try:
+                result = func(*args, **kwargs)
+            finally:
+                profiler._exit()
+            if outermost:
+                profiler.record(name, time.perf_counter() - start, elements(result) if callable(elements) else elements)
+            return result
+        return wrapper
+    return decorator
+
+@contextmanager
+def profiling(profiler=None):
+    """Record instrumented library calls within the `with` block into a `Profiler` (a new one unless given)."""
+    global _ACTIVE
+    previous = _ACTIVE
+    _ACTIVE = profiler if profiler is not None else Profiler()
+    try:
+        yield _ACTIVE
+    finally:
+        _ACTIVE = previous
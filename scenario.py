@@ -0,0 +1,102 @@
+import os
+codepath_bsoption = os.path.dirname(os.path.abspath(__file__))
+import sys
+sys.path.append('..')
+
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from bsoption import profiler
+from bsoption.bsmodel import getBSArray
+
+metriclist = ['pnl', 'delta', 'theta', 'vega', 'gamma']  # Cube metrics, in position units
+
+def _bookarrays(dfbook, ptfactor=100, tradedate=None):
+    """
+    Underlyings and position arrays of an option book with columns `underlying`, `type` ('C'/'P'), `strike`,
+    `iv` (in %), `qty`, `spot`, and `days` to expiry or `expiry` (with `tradedate`); an optional `ptfactor` column
+    overrides the default contract multiplier.
+    """
+    if 'days' in dfbook.columns:
+        days = dfbook['days'].to_numpy(dtype=float)
+    else:
+        days = (pd.to_datetime(dfbook['expiry']) - pd.Timestamp(tradedate)).dt.days.to_numpy(dtype=float)
+    factor = dfbook['ptfactor'].to_numpy(dtype=float) if 'ptfactor' in dfbook.columns else np.full(len(dfbook), ptfactor)
+    undlist, undcode = np.unique(dfbook['underlying'].to_numpy(), return_inverse=True)
+    posdict = {'undcode': undcode, 'iscall': dfbook['type'].to_numpy() == 'C',
+               'strike': dfbook['strike'].to_numpy(dtype=float), 'days': days, 'iv': dfbook['iv'].to_numpy(dtype=float),
+               'size': dfbook['qty'].to_numpy(dtype=float) * factor, 'spot': dfbook['spot'].to_numpy(dtype=float)}
+    return undlist, posdict
+
+def _cubechunk(args):
+    """Risk cube worker: full revaluation of one chunk of positions, summed per underlying code."""
+    start, posdict, spotshocks, volshocks, dayshocks, rf, numund, positionpath = args
+    # Position axis first, then (spot, vol, time) shock axes
+    grid = lambda x: x[:, None, None, None]
+    spot = grid(posdict['spot']) * (1 + spotshocks[None, :, None, None])
+    sig = np.maximum(grid(posdict['iv']) + volshocks[None, None, :, None], 0) / 100
+    days = np.maximum(grid(posdict['days']) - dayshocks[None, None, None, :], 0)
+    valuelist = list(getBSArray(spot, grid(posdict['strike']), days, sig, rf, grid(posdict['iscall'])))
+    base = getBSArray(posdict['spot'], posdict['strike'], posdict['days'], posdict['iv'] / 100, rf, posdict['iscall'])[0]
+    numpos = len(base)
+    # Per-position cubes into the on-disk arrays
+    if positionpath is not None:
+        size = grid(posdict['size'])
+        for metric, values in zip(metriclist, [valuelist[0] - grid(base)] + valuelist[1:]):
+            posmap = np.load(os.path.join(positionpath, f'{metric}.npy'), mmap_mode='r+')
+            posmap[start:start + numpos] = values * size
+            posmap.flush()
+            del posmap
+    # Size-weighted sums per underlying as (underlying x position) @ (position x grid cell) products
+    weight = np.zeros((numund, numpos))
+    weight[posdict['undcode'], np.arange(numpos)] = posdict['size']
+    aggcube = np.stack([weight @ values.reshape(numpos, -1) for values in valuelist])
+    aggcube[0] -= (weight @ base)[:, None]  # P&L against unshocked value
+
+    return aggcube
+
+@profiler.timed('scenario')
+def getriskcube(dfbook, spotshocks, volshocks=(0,), dayshocks=(0,), ptfactor=100, tradedate=None, rf=0,
+                chunksize=None, maxcells=2 ** 20, maxworkers=1, positionpath=None):
+    """
+    Full Black-Scholes revaluation of an option book over a (spot x vol x time) shock grid.
+    `spotshocks` are relative spot moves (0.05 = +5%), `volshocks` IV changes in % points and `dayshocks` days elapsed.
+    P&L is against the unshocked value; greeks follow `getBSArray` units. All are scaled by quantity x `ptfactor`.
+    Positions are revalued in chunks of `chunksize` (default: `maxcells` grid cells per chunk), optionally over a
+    process pool of `maxworkers`, so memory stays bounded by the chunk. Per-position float32 cubes of shape
+    (positions, spot, vol, time) are written to `{positionpath}/{metric}.npy` when `positionpath` is given.
+    Returns {underlying: {metric: (spot, vol, time) array}}.
+    """
+    spotshocks, volshocks, dayshocks = [np.atleast_1d(np.asarray(x, dtype=float))
+                                        for x in (spotshocks, volshocks, dayshocks)]
+    undlist, posdict = _bookarrays(dfbook, ptfactor, tradedate)
+    numpos = len(dfbook)
+    gridshape = (spotshocks.size, volshocks.size, dayshocks.size)
+    chunksize = chunksize or max(1, maxcells // int(np.prod(gridshape)))
+    if positionpath is not None:
+        os.makedirs(positionpath, exist_ok=True)
+        for metric in metriclist:
+            np.lib.format.open_memmap(os.path.join(positionpath, f'{metric}.npy'), mode='w+', dtype=np.float32,
+                                      shape=(numpos,) + gridshape).flush()
+    argiter = ((start, {key: value[start:start + chunksize] for key, value in posdict.items()}, spotshocks, volshocks,
+                dayshocks, rf, len(undlist), positionpath) for start in range(0, numpos, chunksize))
+    # Sum chunk results per underlying as they arrive
+    aggcube = np.zeros((len(metriclist), len(undlist)) + gridshape)
+    if maxworkers == 1:
+        for args in argiter:
+            aggcube += _cubechunk(args).reshape(aggcube.shape)
+    else:
+        with ProcessPoolExecutor(max_workers=maxworkers) as pool:
+            for chunkcube in pool.map(_cubechunk, argiter):
+                aggcube += chunkcube.reshape(aggcube.shape)
+    aggdict = {str(name): {metric: aggcube[j, i] for j, metric in enumerate(metriclist)} for i, name in enumerate(undlist)}
+
+    return aggdict
+
+def cubetoframe(cubedict, spotshocks, volshocks=(0,), dayshocks=(0,)):
+    """Flatten one underlying's {metric: cube} into a DataFrame indexed by (spotshock, volshock, dayshock)."""
+    index = pd.MultiIndex.from_product([np.atleast_1d(spotshocks), np.atleast_1d(volshocks), np.atleast_1d(dayshocks)],
+                                       names=['spotshock', 'volshock', 'dayshock'])
+    return pd.DataFrame({metric: cube.ravel() for metric, cube in cubedict.items()}, index=index)
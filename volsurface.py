@@ -0,0 +1,101 @@
+import os
+codepath_bsoption = os.path.dirname(os.path.abspath(__file__))
+import sys
+sys.path.append('..')
+
+import numpy as np
+
+from bsoption.optionchain import OptionChain
+
+modelist = ['sticky-strike', 'sticky-moneyness']  # Surface behaviour under spot shifts
+
+class VolSurface():
+    """
+    Implied volatility surface of one snapshot, IV in %.
+    Each expiry is a smile over sorted log-moneyness nodes, linear between nodes (slopes precomputed) and flat
+    beyond the wings; between expiries total variance is linear in days, with flat IV outside the expiry range.
+    """
+
+    def __init__(self, spot, days, strikes, ivs):
+        """`days` to expiry per slice, with the `strikes` & `ivs` (in %) of each slice as one array per slice."""
+        self.spot = float(spot)  # Snapshot underlying price
+        order = np.argsort(np.asarray(days, dtype=float))
+        self.days = np.asarray(days, dtype=float)[order]  # Days to expiry of slices (ascending)
+        assert (np.diff(self.days) > 0).all(), AttributeError('Slices must have distinct days to expiry!')
+        self.nodes, self.nodeivs, self.slopes = [], [], []  # Per slice: log-moneyness nodes, IVs, slopes after node
+        for i in order:
+            strike, iv = np.asarray(strikes[i], dtype=float), np.asarray(ivs[i], dtype=float)
+            valid = np.isfinite(strike) & np.isfinite(iv) & (strike > 0) & (iv > 0)
+            node, nodeiv = np.unique(np.log(strike[valid] / self.spot), return_index=True)
+            assert node.size, AttributeError('Slice without valid IV!')
+            nodeiv = iv[valid][nodeiv]
+            self.nodes.append(node)
+            self.nodeivs.append(nodeiv)
+            self.slopes.append(np.append(np.diff(nodeiv) / np.diff(node), 0.0))
+
+    @classmethod
+    def fromchains(cls, chainlist, opType='OTM'):
+        """
+        Build from `(dfchain, info)` pairs (DataFrame or `OptionChain`) of one underlying & trade date, spot of the
+        first. `opType` picks call IVs, put IVs or out-of-the-money IVs (puts below spot, calls above).
+        """
+        assert opType in ['C', 'P', 'OTM'], AttributeError('opType must be C, P or OTM!')
+        spot = chainlist[0][1][-1]
+        days, strikes, ivs = [], [], []
+        for dfchain, info in chainlist:
+            if isinstance(dfchain, OptionChain):
+                strike, civ, piv = dfchain.strike, dfchain.c_iv, dfchain.p_iv
+            else:
+                strike, civ, piv = dfchain.index.to_numpy(), dfchain['c_iv'].to_numpy(), dfchain['p_iv'].to_numpy()
+            strike = np.asarray(strike, dtype=float)
+            if opType == 'OTM':
+                iv = np.where(strike < spot, piv, civ)
+            else:
+                iv = civ if opType == 'C' else piv
+            days.append((info[2] - info[1]).days)
+            strikes.append(strike)
+            ivs.append(iv)
+        return cls(spot, days, strikes, ivs)
+
+    def _sliceiv(self, i, logm):
+        """IV of slice `i` at log-moneyness points: node lookup by binary search, then the precomputed line."""
+        node = self.nodes[i]
+        idx = np.clip(np.searchsorted(node, logm, side='right') - 1, 0, node.size - 1)
+        return self.nodeivs[i][idx] + self.slopes[i][idx] * (np.clip(logm, node[0], node[-1]) - node[idx])
+
+    def getiv(self, spot, strike, days, mode='sticky-strike'):
+        """
+        IV (in %) at broadcastable arrays of spot, strike & days to expiry. Under `sticky-strike` a strike keeps its
+        snapshot IV whatever the spot; under `sticky-moneyness` the smile moves with spot (IV set by strike / spot).
+        """
+        assert mode in modelist, AttributeError(f'mode must be in {modelist}!')
+        spot, strike, days = np.broadcast_arrays(np.asarray(spot, dtype=float), np.asarray(strike, dtype=float),
+                                                 np.asarray(days, dtype=float))
+        logm = np.log(strike / (self.spot if mode == 'sticky-strike' else spot)).ravel()
+        shape = days.shape
+        days = days.ravel()
+        # Bracketing slices of each point (the same slice outside the expiry range)
+        numslice = self.days.size
+        position = np.searchsorted(self.days, days, side='left')
+        lower = np.clip(position - 1, 0, numslice - 1)
+        upper = np.clip(position, 0, numslice - 1)
+        lowiv = np.empty(days.size)
+        upiv = np.empty(days.size)
+        # Points grouped once by bracket, so each point is looked up in its own two slices only
+        if days.size and (position == position[0]).all():
+            grouplist = [np.arange(days.size)]
+        else:
+            order = np.argsort(position, kind='stable')
+            grouplist = np.split(order, np.searchsorted(position[order], np.arange(1, numslice + 1)))
+        for idx in grouplist:
+            if not idx.size:
+                continue
+            low, up = lower[idx[0]], upper[idx[0]]
+            lowiv[idx] = self._sliceiv(low, logm[idx])
+            upiv[idx] = lowiv[idx] if up == low else self._sliceiv(up, logm[idx])
+        # Linear total variance in days between the bracketing slices
+        lowday, upday = self.days[lower], self.days[upper]
+        frac = np.divide(days - lowday, upday - lowday, out=np.zeros(days.shape), where=upday > lowday)
+        var = lowiv ** 2 * lowday * (1 - frac) + upiv ** 2 * upday * frac
+        iv = np.where(upday > lowday, np.sqrt(var / np.where(days > 0, days, 1)), lowiv).reshape(shape)
+        return iv if iv.ndim else float(iv)